@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark SplunkbaseDownloader.check_and_update_apps against a local Splunkbase stand-in.
+
+Every mode runs in its own process so that peak RSS is measured per mode:
+
+    python benchmarks/bench_downloader.py --apps 200 --latency 0.05 --payload_size 4194304
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from mock_splunkbase import MockSplunkbase  # noqa: E402
+
+# Downloader command line arguments of each mode, "{workers}" is replaced by --workers
+MODES: Dict[str, List[str]] = {
+    "serial": ["--workers", "1", "--engine", "sync"],
+    "threads": ["--workers", "{workers}", "--engine", "sync"],
+    "async": ["--workers", "{workers}", "--engine", "async"],
+    "segmented": ["--workers", "{workers}", "--engine", "sync", "--segments", "4", "--segment_threshold", "1"],
+    "nocache": ["--workers", "{workers}", "--engine", "sync", "--io_mode", "nocache"],
+}
+
+
+def _get_page_cache() -> Optional[int]:
+    """Return the bytes held by the page cache, None where /proc/meminfo is missing."""
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("Cached:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _make_downloader(base_url: str, engine: str, argv: List[str]):
+    """Build a downloader pointing at the mock server, configured from argv."""
+    from splunkbase_downloader.app_downloader import SplunkbaseDownloader
+
+    if engine == "async":
+        from splunkbase_downloader.async_downloader import AsyncSplunkbaseDownloader as base
+    else:
+        base = SplunkbaseDownloader
+
+    downloader_class = type("BenchmarkDownloader", (base,), {
+        "BASE_URL": base_url,
+        "DOWNLOAD_API": f"{base_url}/api/v2/apps/{{app_id}}/releases/{{version}}/download/?origin=sb&lead=false",
+        "VERSION_API": f"{base_url}/api/v1/app/{{uid}}/release/",
+        "LOGIN_API": f"{base_url}/api/account:login/",
+    })
+
+    # ConfigurationManager reads the command line
+    sys.argv = [sys.argv[0]] + argv
+    downloader = downloader_class()
+    downloader.logger.setLevel(logging.WARNING)
+    return downloader
+
+
+def run_mode(args: argparse.Namespace) -> Dict:
+    """Run one benchmark mode in the current process and return its measurements."""
+    work_dir = tempfile.mkdtemp(prefix="splunkbase_bench_")
+    os.chdir(work_dir)  # Keep any local .env out of the benchmark
+
+    apps_file = os.path.join(work_dir, "apps.json")
+    with open(apps_file, "w", encoding="utf-8") as file:
+        json.dump([{"name": f"bench_app_{uid}", "uid": uid, "appid": f"bench_app_{uid}", "version": "0"}
+                   for uid in range(args.apps)], file)
+
+    argv = ["--username", "bench", "--password", "bench", "--output", os.path.join(work_dir, "apps")]
+    argv += [arg.format(workers=args.workers) for arg in MODES[args.mode]]
+    downloader = _make_downloader(args.base_url, argv[argv.index("--engine") + 1], argv)
+    downloader.apps_file = apps_file
+
+    cache_start = _get_page_cache()
+    start = time.perf_counter()
+    if downloader.engine == "async":
+        downloaded, skipped = asyncio.run(downloader.run())
+    else:
+        downloader.authenticate()
+        downloaded, skipped = downloader.check_and_update_apps()
+        downloader.close()
+    wall_time = time.perf_counter() - start
+    cache_end = _get_page_cache()
+
+    output = os.path.join(work_dir, "apps")
+    total_bytes = sum(entry.stat().st_size for entry in os.scandir(output)) if os.path.isdir(output) else 0
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "mode": args.mode,
+        "apps": args.apps,
+        "downloaded": len(downloaded),
+        "skipped": len(skipped),
+        "wall_time": round(wall_time, 3),
+        "apps_per_sec": round(args.apps / wall_time, 2),
+        "bytes_per_sec": round(total_bytes / wall_time),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "page_cache_mb": round((cache_end - cache_start) / 1024 / 1024, 1) if cache_start is not None else "n/a",
+    }
+
+
+def _format_table(results: List[Dict]) -> str:
+    columns = ["mode", "downloaded", "skipped", "wall_time", "apps_per_sec", "bytes_per_sec", "peak_rss_mb", "page_cache_mb"]
+    rows = [columns] + [[str(result[column]) for column in columns] for result in results]
+    widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+    return "\n".join("  ".join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SplunkbaseDownloader against a local Splunkbase stand-in")
+    parser.add_argument("--apps", type=int, default=100, help="Number of apps in the catalog")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds of latency added to each GET")
+    parser.add_argument("--payload_size", type=int, default=1024 * 1024, help="Size in bytes of every package")
+    parser.add_argument("--releases", type=int, default=3, help="Number of releases listed for every app")
+    parser.add_argument("--workers", type=int, default=8, help="Workers used by the concurrent modes")
+    parser.add_argument("--modes", type=str, default=",".join(MODES), help=f"Comma separated modes among: {', '.join(MODES)}")
+    parser.add_argument("--json", type=str, help="Also write the results to this JSON file")
+    parser.add_argument("--mode", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--base_url", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args)))
+        return 0
+
+    server = MockSplunkbase(args.latency, args.payload_size, args.releases).start()
+    results = []
+    try:
+        for mode in args.modes.split(","):
+            if mode not in MODES:
+                parser.error(f"Unknown mode '{mode}'")
+            command = [sys.executable, os.path.abspath(__file__), "--mode", mode, "--base_url", server.base_url,
+                       "--apps", str(args.apps), "--workers", str(args.workers)]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(completed.stderr, file=sys.stderr)
+                return 1
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    finally:
+        server.stop()
+
+    print(f"{args.apps} apps, {args.payload_size} bytes per package, {args.latency}s latency, {args.workers} workers\n")
+    print(_format_table(results))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+SESSION_COOKIE = "sessionid=benchmark"
+LAST_MODIFIED = "Wed, 13 Nov 2024 03:53:58 GMT"
+
+
+class MockSplunkbaseHandler(BaseHTTPRequestHandler):
+    """Serves the login, release list and download endpoints used by SplunkbaseDownloader."""
+
+    protocol_version = "HTTP/1.1"
+    RELEASE_PATH = re.compile(r"^/api/v1/app/(?P<uid>[^/]+)/release/")
+    DOWNLOAD_PATH = re.compile(r"^/api/v2/apps/(?P<app_id>[^/]+)/releases/(?P<version>[^/]+)/download/")
+
+    def log_message(self, format, *args) -> None:
+        """Keep benchmark output clean."""
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.count("login")
+        self._send(200, b"{}", {"Set-Cookie": f"{SESSION_COOKIE}; Path=/"})
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.latency)
+
+        if SESSION_COOKIE not in (self.headers.get("Cookie") or ""):
+            self._send(401)
+            return
+
+        match = self.RELEASE_PATH.match(self.path)
+        if match:
+            self._send_releases(match.group("uid"))
+            return
+
+        match = self.DOWNLOAD_PATH.match(self.path)
+        if match:
+            self._send_package()
+            return
+
+        self._send(404)
+
+    def _send_releases(self, uid: str) -> None:
+        self.server.count("version")
+        etag = f'"{uid}-{self.server.releases}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+            return
+
+        releases = [
+            {"name": f"{self.server.releases - index}.0.0", "product_versions": ["9.1", "9.2"] if index == 0 else ["8.2", "9.0"]}
+            for index in range(self.server.releases)
+        ]
+        body = json.dumps(releases).encode()
+        self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+    def _send_package(self) -> None:
+        self.server.count("download")
+        payload = self.server.payload
+        headers = {"Accept-Ranges": "bytes", "Last-Modified": LAST_MODIFIED}
+        status = 200
+
+        range_header = self.headers.get("Range")
+        if range_header and range_header.startswith("bytes="):
+            start, _, end = range_header[len("bytes="):].partition("-")
+            start = int(start)
+            end = int(end) if end else len(payload) - 1
+            if start >= len(payload):
+                self._send(416, headers={"Content-Range": f"bytes */{len(payload)}"})
+                return
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(payload)}"
+            payload = payload[start:end + 1]
+            status = 206
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+
+        # Send the payload in slices so large packages do not need a second copy
+        view = memoryview(payload)
+        for offset in range(0, len(view), 1024 * 1024):
+            self.wfile.write(view[offset:offset + 1024 * 1024])
+        self.server.count("bytes", len(payload))
+
+
+class MockSplunkbase(ThreadingHTTPServer):
+    """
+    Local stand-in for the Splunkbase endpoints, running in a background thread.
+
+    Args:
+        latency: Seconds added before answering each GET request
+        payload_size: Size in bytes of every downloaded package
+        releases: Number of releases listed for every app
+        port: Listening port, 0 picks a free one
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, latency: float = 0.05, payload_size: int = 1024 * 1024, releases: int = 3, port: int = 0):
+        super().__init__(("127.0.0.1", port), MockSplunkbaseHandler)
+        self.latency = latency
+        self.releases = max(1, releases)
+        self.payload = bytes(range(256)) * (payload_size // 256) + b"\0" * (payload_size % 256)
+        self.stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Root URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increment a request statistic."""
+        with self._stats_lock:
+            self.stats[name] = self.stats.get(name, 0) + value
+
+    def start(self) -> "MockSplunkbase":
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local Splunkbase stand-in server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--payload_size", type=int, default=1024 * 1024)
+    parser.add_argument("--releases", type=int, default=3)
+    args = parser.parse_args()
+
+    server = MockSplunkbase(args.latency, args.payload_size, args.releases, args.port)
+    print(f"Mock Splunkbase listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -1,20 +1,47 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
 import datetime
+import email.utils
+import errno
+import hashlib
 import json
 import logging
 import os
+import queue
+import signal
 import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import open
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl
 
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
+    from .catalog_store import SqliteCatalogStore, is_sqlite_catalog
+    from .bulk_writer import BulkWriter, drop_cache
     from .config_manager import ConfigurationManager
+    from .disk_space import DiskSpace, InsufficientSpaceError, preallocate
+    from .file_utils import open_locked, read_json, replace_locked, write_at, write_json_atomic
+    from .manifest import OutputIndex, PackageManifest, hash_file
+    from .metrics import RunMetrics
+    from .rate_limiter import BandwidthLimiter, ByteBudget, RateLimiter, RetryPolicy
+    from .versioning import VersionConstraint
 except ImportError:
+    from catalog_store import SqliteCatalogStore, is_sqlite_catalog
+    from bulk_writer import BulkWriter, drop_cache
     from config_manager import ConfigurationManager
+    from disk_space import DiskSpace, InsufficientSpaceError, preallocate
+    from file_utils import open_locked, read_json, replace_locked, write_at, write_json_atomic
+    from manifest import OutputIndex, PackageManifest, hash_file
+    from metrics import RunMetrics
+    from rate_limiter import BandwidthLimiter, ByteBudget, RateLimiter, RetryPolicy
+    from versioning import VersionConstraint
 
 
 class SplunkbaseDownloader:
@@ -24,6 +51,8 @@ class SplunkbaseDownloader:
     DOWNLOAD_API = "https://api.splunkbase.splunk.com/api/v2/apps/{app_id}/releases/{version}/download/?origin=sb&lead=false"
     VERSION_API = f"{BASE_URL}/api/v1/app/{{uid}}/release/"
     LOGIN_API = f"{BASE_URL}/api/account:login/"
+    CATALOG_API = f"{BASE_URL}/api/v1/app/"
+    CATALOG_PAGE_SIZE = 100
 
     def __init__(self, **kwargs):
         """
@@ -38,20 +67,126 @@ class SplunkbaseDownloader:
         self.args_splunkbase = self._config.config_data.get("splunkbase", {})
         self.args_apps = self._config.config_data.get("apps", {})
         self.apps_file = self.args_apps.get("file", None)
-        self.output = self.args_apps.get("output", "./")
+        self.output = self.args_apps.get("output") or "./"
+        self.workers = max(1, int(self.args_apps.get("workers") or 1))
+        self.lookup_workers = max(1, int(self.args_apps.get("lookup_workers") or self.workers))
+        self.download_workers = max(1, int(self.args_apps.get("download_workers") or self.workers))
+        self.download_queue = max(1, int(self.args_apps.get("download_queue") or 2 * self.download_workers))
+        self.engine = self.args_apps.get("engine", "sync")
+        self.chunk_size = max(1, int(self.args_apps.get("chunk_size") or 1024 * 1024))
+        self.io_mode = self.args_apps.get("io_mode", "buffered")
+        self.segments = max(1, int(self.args_apps.get("segments") or 1))
+        self.segment_threshold = max(0, self._get_number(self.args_apps, "segment_threshold", 64 * 1024 * 1024))
+        self.download_bandwidth_limit = max(0, int(self.args_apps.get("download_bandwidth_limit") or 0))
+        self.bandwidth_limiter = BandwidthLimiter(int(self.args_apps.get("bandwidth_limit") or 0))
+        self.inflight_budget = ByteBudget(int(self.args_apps.get("inflight_budget") or 0))
+        self.preallocate = str(self.args_apps.get("preallocate") or "").lower() in ("1", "true", "yes", "on")
+        self.disk_space = DiskSpace(self.output, int(self.args_apps.get("min_free_space") or 0))
+        self.pool_size = max(1, int(self.args_splunkbase.get("pool_size") or max(self.lookup_workers + self.download_workers, 10)))
+        self.checkpoint = max(0, int(self.args_apps.get("checkpoint") or 0))
+        self.check_interval = max(0, int(self.args_apps.get("check_interval") or 0))
+        self.daemon = str(self.args_apps.get("daemon") or "").lower() in ("1", "true", "yes", "on")
+        self.interval = max(1, int(self.args_apps.get("interval") or 3600))
+        self.sync = str(self.args_apps.get("sync") or "").lower() in ("1", "true", "yes", "on")
+        self.sync_filter = self.args_apps.get("sync_filter", None) or ""
+        self.metadata_cache_file = self.args_apps.get("metadata_cache", None)
+        self.session_file = self.args_splunkbase.get("session_file", None)
+        self.session_ttl = max(0, self._get_number(self.args_splunkbase, "session_ttl", 3600))
+        self.metrics_file = self.args_apps.get("metrics_file", None)
+        self.metrics_format = self.args_apps.get("metrics_format", "json")
+        self.metrics = RunMetrics()
+        self.rate_limiter = RateLimiter(
+            rate=float(self.args_splunkbase.get("rate_limit") or 0),
+            max_concurrency=self.lookup_workers + self.download_workers
+        )
+        self.retry_policy = RetryPolicy(
+            max_retries=self._get_number(self.args_splunkbase, "max_retries", 3),
+            backoff=self._get_number(self.args_splunkbase, "retry_backoff", 1.0, float)
+        )
+        self.trust_manifest = str(self.args_apps.get("trust_manifest") or "").lower() in ("1", "true", "yes", "on")
+        self.manifest = PackageManifest(self.output)
+        self.output_index = OutputIndex(self.output)
         self.cookies = None
+        self.session = self._create_session()
+        self._auth_lock = threading.Lock()
+        self._fresh_cookies: Optional[Dict[str, str]] = None
+        self._metadata_cache: Dict[str, Dict] = {}
+        self._metadata_cache_dirty = False
+        self._metadata_cache_lock = threading.Lock()
+        self.apps_data: Optional[List[Dict]] = None
+        self._apps_index: Dict = {}
+        self._pending_updates = 0
+        self._pending_checks = 0
+        # Fields of each app changed since the last flush, None for apps added by this run
+        self._changed_fields: Dict[Any, Optional[set]] = {}
+        self._apps_file_mtime_ns: Optional[int] = None
+        self._catalog_store: Optional[SqliteCatalogStore] = None
+        self._apps_file_lock = threading.Lock()
         self.logger = self._setup_logger()
 
     def _get_args(self) -> dict:
         self._config.add_argument("--username", "-u", type=str, help="Splunkbase username", required=False)
         self._config.add_argument("--password", "-p", type=str, help="Splunkbase password", required=False)
+        self._config.add_argument("--pool_size", type=int, help="Maximum number of pooled connections per Splunkbase host", required=False)
+        self._config.add_argument("--session_file", type=str, help="Path of the file caching the authenticated Splunkbase session", required=False)
+        self._config.add_argument("--session_ttl", type=int, help="Seconds a cached Splunkbase session is reused before logging in again", required=False)
+        self._config.add_argument("--rate_limit", type=float, help="Maximum Splunkbase requests per second (0: unlimited)", required=False)
+        self._config.add_argument("--max_retries", type=int, help="Retries of throttled (429) or failed (5xx) requests", required=False)
+        self._config.add_argument("--retry_backoff", type=float, help="Base delay in seconds of the exponential retry backoff", required=False)
         self._config.add_argument("--apps_file", "-a", type=str, help="Path to the apps list file", required=False)
         self._config.add_argument("--output", "-o", type=str, help="Output directory", required=False)
+        self._config.add_argument("--chunk_size", type=int, help="Download chunk size in bytes", required=False)
+        self._config.add_argument("--segments", type=int, help="Number of ranges large packages are downloaded in concurrently (1: single stream)", required=False)
+        self._config.add_argument("--segment_threshold", type=int, help="Size in bytes from which a package is downloaded in segments", required=False)
+        self._config.add_argument("--bandwidth_limit", type=int, help="Maximum download rate in bytes per second, shared by all downloads (0: unlimited)", required=False)
+        self._config.add_argument("--download_bandwidth_limit", type=int, help="Maximum rate of a single download in bytes per second (0: unlimited)", required=False)
+        self._config.add_argument("--inflight_budget", type=int, help="Maximum bytes buffered in memory by all downloads at once (0: unlimited)", required=False)
+        self._config.add_argument("--min_free_space", type=int, help="Bytes to always leave free on the output volume", required=False)
+        self._config.add_argument("--preallocate", action="store_true", help="Allocate the disk space of each package before downloading it", required=False)
+        self._config.add_argument("--checkpoint", type=int, help="Save the apps file every N updates (0: once at the end of the run)", required=False)
+        self._config.add_argument("--check_interval", type=int, help="Minimum seconds between two version checks of an app (0: every run)", required=False)
+        self._config.add_argument("--metadata_cache", type=str, help="Path of the release metadata cache used for conditional version checks", required=False)
+        self._config.add_argument("--metrics_file", type=str, help="Export the run metrics to this file", required=False)
+        self._config.add_argument("--metrics_format", type=str, choices=["json", "prometheus"], help="Format of the metrics file", required=False)
+        self._config.add_argument("--trust_manifest", action="store_true", help="Build the output index from the manifest instead of listing the output directory", required=False)
+        self._config.add_argument("--daemon", "-d", action="store_true", help="Keep running and check the apps every --interval seconds", required=False)
+        self._config.add_argument("--interval", type=int, help="Seconds between two runs in daemon mode", required=False)
+        self._config.add_argument("--sync", action="store_true", help="Synchronize the apps file with the Splunkbase app listing and exit", required=False)
+        self._config.add_argument("--sync_filter", type=str, help="Query string filtering the Splunkbase app listing, e.g. 'product=splunk'", required=False)
+        self._config.add_argument("--workers", "-w", type=int, help="Number of apps processed concurrently", required=False)
+        self._config.add_argument("--lookup_workers", type=int, help="Number of concurrent version lookups (default: --workers)", required=False)
+        self._config.add_argument("--download_workers", type=int, help="Number of concurrent downloads (default: --workers)", required=False)
+        self._config.add_argument("--download_queue", type=int, help="Number of looked up packages waiting for a download worker (default: twice --download_workers)", required=False)
+        self._config.add_argument("--engine", "-e", type=str, choices=["sync", "async"], help="Execution engine", required=False)
+        self._config.add_argument("--io_mode", type=str, choices=["buffered", "nocache"], help="How packages are written to disk", required=False)
         args = self._config.parser.parse_args()
 
         self._config.load_config_file(args.config)
-        self._config.set_config_group(section="splunkbase", keys=["username", "password"], env_prefix="SPLUNK_ASD")
-        self._config.set_config_group(section="apps", keys=["file", "output"], env_prefix="SPLUNK_ASD")
+        self._config.set_config_group(section="splunkbase", keys=["username", "password", "pool_size", "session_file", "session_ttl", "rate_limit", "max_retries", "retry_backoff"], env_prefix="SPLUNK_ASD")
+        self._config.set_config_group(section="apps", keys=["file", "output", "workers", "chunk_size", "checkpoint", "check_interval", "metadata_cache", "trust_manifest", "daemon", "interval", "sync", "sync_filter", "lookup_workers", "download_workers", "download_queue", "segments", "segment_threshold", "bandwidth_limit", "download_bandwidth_limit", "inflight_budget", "min_free_space", "preallocate"], env_prefix="SPLUNK_ASD")
+        self._config.set_config(key="engine", section="apps", env_key="SPLUNK_ASD_ENGINE", default="sync")
+        self._config.set_config(key="metrics_file", section="apps", env_key="SPLUNK_ASD_METRICS_FILE")
+        self._config.set_config(key="metrics_format", section="apps", env_key="SPLUNK_ASD_METRICS_FORMAT", default="json")
+        self._config.set_config(key="io_mode", section="apps", env_key="SPLUNK_ASD_IO_MODE", default="buffered")
+
+    @staticmethod
+    def _get_number(args: Dict, key: str, default, cast=int):
+        """
+        Read a numeric option, keeping an explicit 0.
+
+        Args:
+            args: The configuration section
+            key: The option name
+            default: The value used when the option is not set
+            cast: The option type
+
+        Returns:
+            The option value
+        """
+        value = args.get(key)
+        if value is None or value == "":
+            return default
+        return cast(value)
 
     @staticmethod
     def _setup_logger() -> logging.Logger:
@@ -59,6 +194,10 @@ class SplunkbaseDownloader:
         logger = logging.getLogger("SplunkbaseDownloader")
         logger.setLevel(logging.INFO)
 
+        # Downloaders share the same named logger, only attach the handler once
+        if logger.handlers:
+            return logger
+
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
@@ -72,13 +211,64 @@ class SplunkbaseDownloader:
 
         return logger
 
-    def authenticate(self) -> None:
+    def _create_session(self) -> requests.Session:
+        """
+        Create the HTTP session shared by all Splunkbase calls.
+
+        Connections are kept alive and pooled per host, so a run only pays the
+        TCP and TLS handshakes once per pooled connection.
+
+        Returns:
+            A configured requests session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections and the catalog database."""
+        self.session.close()
+        self._close_catalog_store()
+
+    def _close_catalog_store(self) -> None:
+        """Close the SQLite catalog, if one was opened."""
+        if self._catalog_store is not None:
+            self._catalog_store.close()
+            self._catalog_store = None
+
+    def _set_session_cookies(self, cookies: Dict[str, str]) -> None:
+        """
+        Store authentication cookies on the session.
+
+        Splunkbase sets them on splunkbase.splunk.com while downloads go through
+        api.splunkbase.splunk.com, so they are stored without a domain.
+
+        Args:
+            cookies: The authentication cookies
+        """
+        self.cookies = cookies
+        self.session.cookies.clear()
+        self.session.cookies.update(cookies)
+
+    def authenticate(self, force: bool = False) -> None:
         """
         Authenticate with Splunkbase using credentials from the config file.
 
+        A session cached in ``session_file`` by a previous run is reused while it is
+        younger than ``session_ttl`` seconds, unless force is set.
+
+        Args:
+            force: Ignore the cached session and log in again
+
         Raises:
             Exception: If authentication fails
         """
+        if not force and self._load_session_file():
+            self.logger.info("Reusing cached Splunkbase session")
+            return
+
         try:
             payload = {
                 'username': self.args_splunkbase.get('username', None),
@@ -86,10 +276,13 @@ class SplunkbaseDownloader:
             }
 
             self.logger.info("Authenticating with Splunkbase...")
-            response = requests.post(self.LOGIN_API, data=payload)
+            with self.metrics.phase("login"):
+                response = self.session.post(self.LOGIN_API, data=payload)
 
             if response.status_code == 200:
-                self.cookies = response.cookies.get_dict()
+                self._set_session_cookies(response.cookies.get_dict())
+                self._fresh_cookies = self.cookies
+                self._save_session_file()
                 self.logger.info("Authentication successful")
             else:
                 raise Exception(f"Authentication failed with status code: {response.status_code}")
@@ -97,15 +290,150 @@ class SplunkbaseDownloader:
             self.logger.error(f"Authentication error: {str(e)}")
             raise
 
-    def get_latest_version(self, uid: str) -> Optional[str]:
+    def _load_session_file(self) -> bool:
         """
-        Retrieve the latest version of an app from Splunkbase.
+        Restore the session cookies cached by a previous run.
+
+        Returns:
+            True if a valid session was restored, False otherwise
+        """
+        data = read_json(self.session_file)
+        if not isinstance(data, dict) or not data.get("cookies"):
+            return False
+        if data.get("username") != self.args_splunkbase.get("username"):
+            return False
+        if time.time() - data.get("created", 0) >= self.session_ttl:
+            self.logger.info("Cached Splunkbase session expired")
+            return False
+
+        self._set_session_cookies(data["cookies"])
+        return True
+
+    def _save_session_file(self) -> None:
+        """Cache the session cookies for later runs, readable by the owner only."""
+        if not self.session_file:
+            return
+        try:
+            write_json_atomic(self.session_file, {
+                "username": self.args_splunkbase.get("username"),
+                "created": time.time(),
+                "cookies": self.cookies
+            }, mode=0o600)
+        except Exception as e:
+            self.logger.warning("Could not cache Splunkbase session: %s", str(e))
+
+    def _is_forbidden(self, cookies: Optional[Dict[str, str]], status_code: int) -> bool:
+        """
+        Tell whether a rejected request failed on the resource rather than on the session.
+
+        Splunkbase also answers 403 for downloads restricted by entitlement or licence,
+        which no login fixes. A 403 on a session logged in during this run is one of those.
+
+        Args:
+            cookies: The cookies of the rejected request
+            status_code: The status code of the rejected request
+
+        Returns:
+            True if logging in again would not help
+        """
+        return status_code == 403 and cookies is not None and cookies is self._fresh_cookies
+
+    def _reauthenticate(self, cookies: Optional[Dict[str, str]], status_code: int) -> bool:
+        """
+        Log in again after Splunkbase rejected the session.
+
+        Args:
+            cookies: The cookies of the rejected request. If another worker already
+                replaced them, its new session is used instead of logging in again.
+            status_code: The status code of the rejected request
+
+        Returns:
+            True if the request should be sent again with the current session
+        """
+        with self._auth_lock:
+            if self.cookies is not cookies:
+                return True
+            if self._is_forbidden(cookies, status_code):
+                return False
+            self.logger.info("Splunkbase session rejected, logging in again")
+            self.authenticate(force=True)
+            return True
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request on the shared session, logging in again once on 401/403.
+
+        A 403 on a session logged in during this run is returned as is, see _is_forbidden.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            kwargs: Keyword arguments for requests.Session.request
+
+        Returns:
+            The response
+        """
+        cookies = self.cookies
+        response = self._send(method, url, **kwargs)
+        if response.status_code in (401, 403) and self._reauthenticate(cookies, response.status_code):
+            response.close()
+            response = self._send(method, url, **kwargs)
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the rate limiter, retrying throttled and failed attempts.
+
+        429, 5xx and connection errors are retried with jittered exponential backoff,
+        honouring Retry-After, up to ``max_retries`` times.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            kwargs: Keyword arguments for requests.Session.request
+
+        Returns:
+            The last response
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.rate_limiter.release(throttled=True)
+                if attempt >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                self.logger.warning(f"Request to {url} failed ({str(e)}), retrying in {delay:.1f}s")
+            except BaseException:
+                # Other errors are not retried, but their slot must still be given back
+                self.rate_limiter.release(throttled=True)
+                raise
+            else:
+                throttled = self.retry_policy.is_retryable(response.status_code)
+                self.rate_limiter.release(throttled=throttled)
+                if not throttled or attempt >= self.retry_policy.max_retries:
+                    return response
+                delay = self.retry_policy.get_delay(attempt, response.headers.get("Retry-After"))
+                self.logger.warning(f"Request to {url} returned {response.status_code}, retrying in {delay:.1f}s")
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+    def get_releases(self, uid: str) -> Optional[List[Dict]]:
+        """
+        Retrieve the release list of an app from Splunkbase, newest first.
+
+        When the metadata cache is enabled, the request is conditional and an
+        unchanged release list is answered by a 304 and served from the cache.
 
         Args:
             uid: The app's unique identifier
 
         Returns:
-            The latest version string or None if retrieval fails
+            The list of releases or None if retrieval fails
         """
         if not self.cookies:
             self.logger.error("Not authenticated. Call authenticate() first.")
@@ -114,15 +442,18 @@ class SplunkbaseDownloader:
         url = self.VERSION_API.format(uid=uid)
 
         try:
-            response = requests.get(url, cookies=self.cookies)
+            with self.metrics.phase("version_lookup", uid):
+                response = self._request("GET", url, headers=self._get_cache_headers(uid))
 
-            if response.status_code == 200:
+            if response.status_code == 304:
+                return self._get_cached_releases(uid)
+            elif response.status_code == 200:
                 data = response.json()
-                if data and len(data) > 0:
-                    return data[0]['name']  # Assuming the first version is the latest
-                else:
-                    self.logger.warning(f"No versions found for app {uid}")
+                if not self._is_release_list(data):
+                    self.logger.error(f"Unexpected release list for {uid}")
                     return None
+                self._cache_releases(uid, response.headers, data)
+                return data
             else:
                 self.logger.error(f"Error retrieving app version for {uid}: Status code {response.status_code}")
                 return None
@@ -131,6 +462,220 @@ class SplunkbaseDownloader:
             self.logger.error(f"Error getting latest version for {uid}: {str(e)}")
             return None
 
+    def get_latest_version(self, uid: str, constraint: Optional[VersionConstraint] = None) -> Optional[str]:
+        """
+        Retrieve the latest version of an app from Splunkbase.
+
+        Args:
+            uid: The app's unique identifier
+            constraint: Only consider the releases satisfying this constraint
+
+        Returns:
+            The latest version string or None if retrieval fails
+        """
+        return self._get_latest_release_name(uid, self.get_releases(uid), constraint)
+
+    def get_versions(self, uid: str, constraint: Optional[VersionConstraint] = None, count: int = 1,
+                     compatibility: Optional[VersionConstraint] = None) -> Optional[List[str]]:
+        """
+        Retrieve several versions of an app from a single release list request.
+
+        Args:
+            uid: The app's unique identifier
+            constraint: Only consider the releases satisfying this constraint
+            count: Number of versions to return, 0 for all of them
+            compatibility: Only consider the releases supporting a Splunk version satisfying this constraint
+
+        Returns:
+            The version strings, newest first, or None if retrieval fails
+        """
+        return self._select_release_names(uid, self.get_releases(uid), constraint, count, compatibility)
+
+    def _get_latest_release_name(self, uid: str, releases: Optional[List[Dict]],
+                                 constraint: Optional[VersionConstraint] = None) -> Optional[str]:
+        """Return the name of the first (latest) release of a release list satisfying the constraint."""
+        names = self._select_release_names(uid, releases, constraint)
+        return names[0] if names else None
+
+    @staticmethod
+    def _is_release_list(data) -> bool:
+        """Return True if a release list payload is a list of releases that all have a name."""
+        return isinstance(data, list) and all(
+            isinstance(release, dict) and isinstance(release.get('name'), str) for release in data
+        )
+
+    def _select_release_names(self, uid: str, releases: Optional[List[Dict]], constraint: Optional[VersionConstraint] = None,
+                              count: int = 1, compatibility: Optional[VersionConstraint] = None) -> Optional[List[str]]:
+        """Return the names of the first (latest) releases of a release list satisfying the constraints."""
+        if releases is None:
+            return None
+        if len(releases) == 0:
+            self.logger.warning(f"No versions found for app {uid}")
+            return None
+
+        # Releases are listed newest first
+        names = [
+            release['name'] for release in releases
+            if (constraint is None or constraint.matches(release['name'])) and (
+                compatibility is None
+                or any(compatibility.matches(str(version)) for version in release.get('product_versions') or [])
+            )
+        ]
+        if not names:
+            self.logger.warning(f"No version of app {uid} satisfies its version constraints")
+            return None
+        return names[:count] if count else names
+
+    def _get_version_policy(self, app: Dict) -> Tuple[Optional[str], Optional[VersionConstraint]]:
+        """
+        Evaluate the version policy of an app entry, without any request.
+
+        An app is pinned by a ``pin`` field, or by a ``constraint`` allowing a single
+        version. Pinned apps need no version lookup; other apps are looked up and
+        updated to the latest release satisfying their ``constraint``, if any.
+
+        Args:
+            app: The app entry from the apps file
+
+        Returns:
+            Tuple of (pinned_version, constraint), pinned_version is None for apps to look up
+
+        Raises:
+            ValueError: If the constraint is invalid
+        """
+        if app.get('pin'):
+            return str(app['pin']), None
+        if not app.get('constraint'):
+            return None, None
+        constraint = VersionConstraint(app['constraint'])
+        return constraint.pinned, constraint
+
+    @staticmethod
+    def _get_release_selection(app: Dict) -> Tuple[int, Optional[VersionConstraint]]:
+        """
+        Read which releases of an app entry to keep besides the latest one.
+
+        ``versions`` is the number of releases to download, newest first, and
+        ``splunk_versions`` restricts them to the releases supporting a Splunk
+        version satisfying a constraint, e.g. '9.x'. All compatible releases are
+        downloaded when only ``splunk_versions`` is set.
+
+        Args:
+            app: The app entry from the apps file
+
+        Returns:
+            Tuple of (count, compatibility), count is 0 for all the matching releases
+
+        Raises:
+            ValueError: If a field is invalid
+        """
+        compatibility = VersionConstraint(app['splunk_versions']) if app.get('splunk_versions') else None
+        count = app.get('versions')
+        if count is None:
+            return (0 if compatibility else 1), compatibility
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            count = -1
+        if count < 0:
+            raise ValueError(f"Invalid versions '{app['versions']}'")
+        return count, compatibility
+
+    def load_metadata_cache(self) -> None:
+        """Load the release metadata cache, if enabled."""
+        if self.metadata_cache_file:
+            self._metadata_cache = read_json(self.metadata_cache_file, default={})
+            self._metadata_cache_dirty = False
+
+    def save_metadata_cache(self) -> None:
+        """Write the release metadata cache if it changed during the run."""
+        if not self.metadata_cache_file or not self._metadata_cache_dirty:
+            return
+        try:
+            with self._metadata_cache_lock:
+                write_json_atomic(self.metadata_cache_file, self._metadata_cache, indent=None)
+                self._metadata_cache_dirty = False
+        except Exception as e:
+            self.logger.error("Error writing metadata cache: %s", str(e))
+
+    def _get_cache_headers(self, uid: str) -> Dict[str, str]:
+        """Return the conditional request headers for the cached release list of an app."""
+        entry = self._metadata_cache.get(str(uid))
+        if not self.metadata_cache_file or not entry:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _get_cached_releases(self, uid: str) -> Optional[List[Dict]]:
+        """Return the cached release list of an app."""
+        entry = self._metadata_cache.get(str(uid)) or {}
+        return entry.get("releases")
+
+    def _cache_releases(self, uid: str, headers, releases: List[Dict]) -> None:
+        """
+        Store a release list with the validators needed to revalidate it.
+
+        Args:
+            uid: The app's unique identifier
+            headers: The release list response headers
+            releases: The decoded release list
+        """
+        if not self.metadata_cache_file:
+            return
+
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        with self._metadata_cache_lock:
+            self._metadata_cache[str(uid)] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "releases": releases
+            }
+            self._metadata_cache_dirty = True
+
+    @staticmethod
+    def _get_file_name(app_name: str, app_id: str, app_version: str) -> str:
+        """Return the package file name of an app version."""
+        return f"{app_name}_{app_id}_{app_version}.tgz"
+
+    def _get_download_path(self, app_name: str, app_id: str, app_version: str) -> Optional[str]:
+        """
+        Build the output path of an app package.
+
+        Existing packages are looked up in the output index. They are verified
+        against the manifest and removed if corrupt, so that they are downloaded again.
+
+        Args:
+            app_name: The name of the app
+            app_id: The app's unique identifier
+            app_version: The version to download
+
+        Returns:
+            The package path, or None if the package already exists
+        """
+        file_name = self._get_file_name(app_name, app_id, app_version)
+        path = os.path.join(self.output, file_name)
+
+        # Check if file already exists
+        if file_name in self.output_index:
+            if self.manifest.verify(path, self.chunk_size, stat=self.output_index.get(file_name)):
+                self.logger.info(f"Skipping download of {file_name} (already exists)")
+                return None
+            self.logger.warning(f"{file_name} does not match its manifest checksum, downloading it again")
+            os.remove(path)
+            self.manifest.forget(file_name)
+            self.output_index.remove(file_name)
+
+        return path
+
     def download_app(self, app_name: str, app_id: str, app_version: str) -> Optional[str]:
         """
         Download a specific version of an app if it doesn't already exist.
@@ -142,93 +687,1102 @@ class SplunkbaseDownloader:
 
         Returns:
             The update timestamp if successful, None otherwise
+
+        Raises:
+            InsufficientSpaceError: If the package does not fit on the output volume
         """
         if not self.cookies:
             self.logger.error("Not authenticated. Call authenticate() first.")
             return None
 
-        file_name = f"{app_name}_{app_id}_{app_version}.tgz"
-
-        # Ensure the output directory exists
-        if not os.path.exists(self.output):
-            os.makedirs(self.output)
-        path = os.path.join(self.output, file_name)
-
-        # Check if file already exists
-        if os.path.exists(path):
-            self.logger.info(f"Skipping download of {file_name} (already exists)")
+        path = self._get_download_path(app_name, app_id, app_version)
+        if not path:
             return None
 
         download_url = self.DOWNLOAD_API.format(app_id=app_id, version=app_version)
+        part_path = f"{path}.part"
 
         try:
-            self.logger.info(f"Downloading {path}...")
-            response = requests.get(download_url, cookies=self.cookies)
+            # The lock keeps concurrent workers and processes off the same partial file
+            part = open_locked(part_path)
+            if part is None:
+                self.logger.info(f"Skipping download of {path} (already being downloaded)")
+                return None
 
-            if response.status_code == 200:
-                with open(path, 'wb') as file:
-                    file.write(response.content)
+            with part:
+                if os.path.exists(path):
+                    # Drop the partial file this call created
+                    os.remove(part_path)
+                    self.logger.info(f"Skipping download of {path} (downloaded concurrently)")
+                    return None
 
-                # Get update timestamp or use current time
-                updated_time = response.headers.get("Last-Modified")
-                if not updated_time:
-                    updated_time = datetime.datetime.utcnow().isoformat() + "Z"
+                self.logger.info(f"Downloading {path}...")
+                try:
+                    result = self._download_to_part(part, part_path, path, download_url, app_id)
+                except BaseException:
+                    self._discard_empty_part(part, part_path)
+                    raise
+                if not result:
+                    self._discard_empty_part(part, part_path)
+                    return None
 
-                self.logger.info(f"Successfully downloaded {path}")
-                return updated_time
-            else:
-                self.logger.error(f"Failed to download {path}. Status code: {response.status_code}")
-                return None
+                # Only a complete, verified and fsync'd package gets its final name
+                updated_time, digest = result
+                replace_locked(part, part_path, path)
+                self._record_package(path, digest.hexdigest())
+
+            self.logger.info(f"Successfully downloaded {path}")
+            return updated_time
 
+        except InsufficientSpaceError:
+            raise
         except Exception as e:
             self.logger.error(f"Error downloading {app_id} v{app_version}: {str(e)}")
             return None
 
-    def update_apps_file(self, uid: str, new_version: str, updated_time: str) -> bool:
+    def _download_to_part(self, part, part_path: str, path: str, download_url: str, app_id: str) -> Optional[Tuple[str, Any]]:
+        """
+        Stream a package into its locked partial file, resuming it when possible.
+
+        Args:
+            part: The locked partial file
+            part_path: The partial file path
+            path: The package path, used for logging
+            download_url: The package download URL
+            app_id: The app's unique identifier
+
+        Returns:
+            Tuple of (updated_time, digest) once the partial file holds the complete
+            package and is fsync'd, None otherwise
         """
-        Update the apps configuration file with new version information.
+        limiter = BandwidthLimiter(self.download_bandwidth_limit)
+        if self.segments > 1 and not part.seek(0, os.SEEK_END):
+            target = self._probe_ranges(download_url, app_id)
+            if target is not None:
+                return self._download_segmented(part, part_path, path, app_id, limiter, *target)
+
+        for _ in range(2):
+            offset = part.seek(0, os.SEEK_END)
+
+            # Stream the package to disk so memory stays flat whatever its size
+            with self.metrics.phase("download_ttfb", app_id):
+                response = self._request("GET", download_url, headers=self._get_range_headers(offset), stream=True)
+
+            with response:
+                if response.status_code == 416 and offset:
+                    # The partial file no longer matches the package, start over
+                    self.logger.warning(f"Discarding stale partial download {part_path}")
+                    part.truncate(0)
+                    continue
+
+                mode = self._get_write_mode(response.status_code, response.headers, offset, path)
+                if not mode:
+                    self.logger.error(f"Failed to download {path}. Status code: {response.status_code}")
+                    return None
+                if mode == 'wb':
+                    part.seek(0)
+                    part.truncate()
+                    offset = 0
+
+                expected_size = self._get_expected_size(response.headers, offset)
+                reserved = self._reserve_space(part, path, expected_size, offset)
+                held = 0
+                try:
+                    writer_budget = self._get_writer_budget()
+                    if writer_budget:
+                        self.inflight_budget.acquire(writer_budget)
+                        held = writer_budget
+                    digest = self._create_digest(part_path, mode)
+                    writer = self._open_writer(part)
+                    transfer_start = time.perf_counter()
+                    write_time = 0.0
+                    chunks = response.iter_content(chunk_size=self.chunk_size)
+                    for chunk in self._limit_chunks(chunks, limiter, hold_budget=not held):
+                        write_start = time.perf_counter()
+                        self._write_chunk(writer, digest, chunk)
+                        write_time += time.perf_counter() - write_start
+                        self.metrics.add_bytes(app_id, len(chunk))
+
+                    write_start = time.perf_counter()
+                    self._sync_file(writer)
+                    write_time += time.perf_counter() - write_start
+                    self.metrics.add("transfer", time.perf_counter() - transfer_start - write_time, app_id)
+                    self.metrics.add("disk_write", write_time, app_id)
+
+                    if not self._check_part_size(part, expected_size, path):
+                        return None
+                    return self._get_updated_time(response.headers), digest
+                finally:
+                    self.inflight_budget.release(held)
+                    self.disk_space.release(reserved)
+
+        return None
+
+    def _probe_ranges(self, download_url: str, app_id: str) -> Optional[Tuple[str, int, Any]]:
+        """
+        Ask the server whether a package can be downloaded in segments.
+
+        Args:
+            download_url: The package download URL
+            app_id: The app's unique identifier
+
+        Returns:
+            Tuple of (url, size, headers) of the package after redirects if it
+            qualifies for a segmented download, None otherwise
+        """
+        with self.metrics.phase("download_ttfb", app_id):
+            response = self._request("HEAD", download_url, allow_redirects=True)
+        with response:
+            return self._get_segmented_target(response.status_code, response.url, response.headers)
+
+    def _get_segmented_target(self, status_code: int, url, headers) -> Optional[Tuple[str, int, Any]]:
+        """
+        Check a HEAD response for byte range support and a size above ``segment_threshold``.
+
+        Args:
+            status_code: The HTTP status code of the HEAD response
+            url: The package URL, after redirects
+            headers: The HEAD response headers
+
+        Returns:
+            Tuple of (url, size, headers) if the package qualifies, None otherwise
+        """
+        if status_code != 200 or headers.get("Accept-Ranges", "").lower() != "bytes" or headers.get("Content-Encoding"):
+            return None
+        size = int(headers.get("Content-Length") or 0)
+        if size < max(self.segment_threshold, self.segments):
+            return None
+        return str(url), size, headers
+
+    def _get_segments(self, size: int) -> List[Tuple[int, int]]:
+        """Split a package of size bytes into ``segments`` inclusive (start, end) byte ranges."""
+        length = -(-size // self.segments)
+        return [(start, min(start + length, size) - 1) for start in range(0, size, length)]
+
+    def _download_segmented(self, part, part_path: str, path: str, app_id: str, limiter: BandwidthLimiter,
+                            url: str, size: int, headers) -> Optional[Tuple[str, Any]]:
+        """
+        Download a package as concurrent byte ranges written in place into its partial file.
+
+        The partial file is extended to the package size first, then each range is
+        written at its position. The digest is computed once the file is complete.
+
+        Args:
+            part: The locked, empty partial file
+            part_path: The partial file path
+            path: The package path, used for logging
+            app_id: The app's unique identifier
+            limiter: The bandwidth cap of this download, shared by its segments
+            url: The package URL, after redirects
+            size: The package size
+            headers: The HEAD response headers
+
+        Returns:
+            Tuple of (updated_time, digest) once the partial file holds the complete
+            package and is fsync'd, None otherwise
+        """
+        segments = self._get_segments(size)
+        reserved = self._reserve_space(part, path, size, 0)
+        self.logger.info(f"Downloading {path} in {len(segments)} segments")
+        transfer_start = time.perf_counter()
+        # Set by the first failing segment, so that the others stop early
+        stop = threading.Event()
+        try:
+            part.truncate(size)
+            with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                futures = [executor.submit(self._download_segment, part.fileno(), url, start, end, app_id, limiter, stop)
+                           for start, end in segments]
+                completed = all([future.result() for future in futures])
+        except BaseException:
+            # Which ranges landed is unknown, the partial file cannot be resumed
+            part.truncate(0)
+            raise
+        finally:
+            self.disk_space.release(reserved)
+        self.metrics.add("transfer", time.perf_counter() - transfer_start, app_id)
+        if not completed:
+            part.truncate(0)
+            return None
+
+        # Hash first, while the pages just written are still cached, then sync
+        write_start = time.perf_counter()
+        digest = hash_file(part_path, self.chunk_size)
+        self._sync_file(part)
+        self.metrics.add("disk_write", time.perf_counter() - write_start, app_id)
+
+        if not self._check_part_size(part, size, path):
+            return None
+        return self._get_updated_time(headers), digest
+
+    def _download_segment(self, fd: int, url: str, start: int, end: int, app_id: str, limiter: BandwidthLimiter,
+                          stop: Optional[threading.Event] = None) -> bool:
+        """
+        Download the byte range [start, end] of a package into its partial file.
+
+        Args:
+            fd: File descriptor of the partial file
+            url: The package URL
+            start: First byte of the range
+            end: Last byte of the range
+            app_id: The app's unique identifier
+            limiter: The bandwidth cap of the download
+            stop: Event shared by the segments of the download, checked between
+                chunks and set when this segment fails
+
+        Returns:
+            True if the whole range was written
+        """
+        completed = False
+        try:
+            response = self._request("GET", url, headers={"Range": f"bytes={start}-{end}"}, stream=True)
+            with response:
+                if not self._is_segment_response(response.status_code, response.headers, start, end):
+                    self.logger.error(f"Failed to download bytes {start}-{end} of {app_id}. Status code: {response.status_code}")
+                    return False
+                position = start
+                for chunk in self._limit_chunks(response.iter_content(chunk_size=self.chunk_size), limiter):
+                    if stop is not None and stop.is_set():
+                        return False
+                    write_at(fd, chunk, position)
+                    position += len(chunk)
+                    self.metrics.add_bytes(app_id, len(chunk))
+            completed = position == end + 1
+            return completed
+        finally:
+            if not completed and stop is not None:
+                stop.set()
+
+    def _limit_chunks(self, chunks, limiter: BandwidthLimiter, hold_budget: bool = True):
+        """
+        Yield the chunks of a download within the bandwidth caps and the in-flight budget.
+
+        A chunk holds its share of ``inflight_budget`` from the moment it is read until
+        the caller is done writing it, i.e. until the next chunk is requested.
+
+        Args:
+            chunks: Iterator over the chunks of a response
+            limiter: The bandwidth cap of the download
+            hold_budget: Count every chunk against the budget, False if the download
+                already holds its share for the whole transfer
+        """
+        chunk_budget = self.chunk_size if hold_budget else 0
+        chunks = iter(chunks)
+        while True:
+            if chunk_budget:
+                self.inflight_budget.acquire(chunk_budget)
+            try:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+            finally:
+                self.inflight_budget.release(chunk_budget)
+            self.bandwidth_limiter.consume(len(chunk))
+            limiter.consume(len(chunk))
+
+    @staticmethod
+    def _is_segment_response(status_code: int, headers, start: int, end: int) -> bool:
+        """Return True if a response holds exactly the byte range [start, end]."""
+        return status_code == 206 and headers.get("Content-Range", "").startswith(f"bytes {start}-{end}/")
+
+    @staticmethod
+    def _discard_empty_part(part, part_path: str) -> None:
+        """Remove a partial file left with nothing to resume, while its lock is still held."""
+        if part.seek(0, os.SEEK_END) == 0 and os.path.exists(part_path):
+            os.remove(part_path)
+
+    def _reserve_space(self, part, path: str, expected_size: Optional[int], offset: int) -> int:
+        """
+        Reserve the disk space a download still needs, and preallocate it if enabled.
+
+        Args:
+            part: The partial file
+            path: The package path, used for logging
+            expected_size: The package size, None if unknown
+            offset: The number of bytes already in the partial file
+
+        Returns:
+            The number of bytes to release once the download is over, 0 if the
+            size is unknown or the space was preallocated
+
+        Raises:
+            InsufficientSpaceError: If the download does not fit on the output volume
+        """
+        if expected_size is None:
+            return 0
+        size = max(0, expected_size - offset)
+        if not self.disk_space.reserve(size):
+            raise InsufficientSpaceError(path, size, self.disk_space.available())
+        if not self.preallocate:
+            return size
+
+        try:
+            allocated = preallocate(part.fileno(), offset, size)
+        except OSError:
+            self.disk_space.release(size)
+            raise InsufficientSpaceError(path, size, self.disk_space.available())
+        if allocated:
+            # The blocks now belong to the partial file, the free space accounts for them
+            self.disk_space.release(size)
+            return 0
+        return size
+
+    @staticmethod
+    def _get_expected_size(headers, offset: int) -> Optional[int]:
+        """
+        Return the full package size announced by a download response.
+
+        Args:
+            headers: The download response headers
+            offset: The byte the response starts at
+
+        Returns:
+            The package size, or None if the server did not announce it
+        """
+        content_range = headers.get("Content-Range", "")
+        if "/" in content_range and not content_range.endswith("/*"):
+            return int(content_range.rsplit("/", 1)[1])
+        content_length = headers.get("Content-Length")
+        # A compressed transfer announces the encoded length, not the package size
+        if content_length and not headers.get("Content-Encoding"):
+            return offset + int(content_length)
+        return None
+
+    def _check_part_size(self, part, expected_size: Optional[int], path: str) -> bool:
+        """
+        Check that a partial file holds the whole package before it is finalized.
+
+        A short file is kept to be resumed, an oversized one is discarded.
+
+        Args:
+            part: The partial file
+            expected_size: The announced package size, None if unknown
+            path: The package path, used for logging
+
+        Returns:
+            True if the partial file is complete
+        """
+        size = part.seek(0, os.SEEK_END)
+        if expected_size is None or size == expected_size:
+            return True
+
+        self.logger.error(f"Incomplete download of {path}: got {size} of {expected_size} bytes")
+        if size > expected_size:
+            part.truncate(0)
+        return False
+
+    def _create_digest(self, part_path: str, mode: str):
+        """
+        Create the SHA-256 digest of a download, seeded with the partial file when resuming.
+
+        Args:
+            part_path: The partial download path
+            mode: The mode the partial file is opened with
+
+        Returns:
+            The digest
+        """
+        if mode == 'ab':
+            return hash_file(part_path, self.chunk_size)
+        return hashlib.sha256()
+
+    def _open_writer(self, part):
+        """
+        Return the object a download writes its partial file through, according to the I/O mode.
+
+        In ``buffered`` mode the partial file is written directly. In ``nocache`` mode
+        it is written through a BulkWriter, which keeps packages out of the page cache.
+
+        Args:
+            part: The partial file, positioned where writing starts
+
+        Returns:
+            The partial file or its writer
+        """
+        if self.io_mode == "nocache":
+            return BulkWriter(part, self._get_buffer_size())
+        return part
+
+    def _get_buffer_size(self) -> int:
+        """Return the BulkWriter buffer size, small enough to fit in the in-flight budget along with a chunk."""
+        buffer_size = BulkWriter.BUFFER_SIZE
+        if self.inflight_budget.limit:
+            buffer_size = min(buffer_size, self.inflight_budget.limit - self.chunk_size)
+        return BulkWriter.align(buffer_size)
+
+    def _get_writer_budget(self) -> int:
+        """
+        Return the in-flight bytes a single stream download holds for its whole transfer.
+
+        In ``nocache`` mode a download holds its writer buffer and the chunk being
+        received at once, so that downloads holding buffers never wait on each other
+        for chunk space. Otherwise each chunk is counted by _limit_chunks.
+
+        Returns:
+            The bytes to hold, 0 if chunks are counted one by one
+        """
+        if self.io_mode != "nocache" or not self.inflight_budget.limit:
+            return 0
+        return self._get_buffer_size() + self.chunk_size
+
+    def _sync_file(self, file) -> None:
+        """Flush a file to disk, then drop it from the page cache in ``nocache`` I/O mode."""
+        file.flush()
+        os.fsync(file.fileno())
+        if self.io_mode == "nocache":
+            drop_cache(file.fileno())
+
+    @staticmethod
+    def _write_chunk(file, digest, chunk: bytes) -> None:
+        """Hash a downloaded chunk and write it to disk."""
+        digest.update(chunk)
+        file.write(chunk)
+
+    @staticmethod
+    def _get_range_headers(offset: int) -> Dict[str, str]:
+        """Return the headers requesting the remainder of a package from offset."""
+        return {"Range": f"bytes={offset}-"} if offset else {}
+
+    def _get_write_mode(self, status_code: int, headers, offset: int, path: str) -> Optional[str]:
+        """
+        Decide how the partial file must be opened for a download response.
+
+        Args:
+            status_code: The HTTP status code of the download response
+            headers: The download response headers
+            offset: The number of bytes already present in the partial file
+            path: The package path, used for logging
+
+        Returns:
+            'ab' to resume, 'wb' to start over, or None if the response is an error
+        """
+        if status_code == 206 and headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+            self.logger.info(f"Resuming download of {path} at byte {offset}")
+            return 'ab'
+        if status_code == 200:
+            if offset:
+                self.logger.info(f"Server ignored the range request, restarting download of {path}")
+            return 'wb'
+        return None
+
+    @staticmethod
+    def _get_updated_time(headers) -> str:
+        """Return the package Last-Modified header, or the current UTC time if missing."""
+        updated_time = headers.get("Last-Modified")
+        if not updated_time:
+            updated_time = datetime.datetime.utcnow().isoformat() + "Z"
+        return updated_time
+
+    def load_apps_file(self) -> List[Dict]:
+        """
+        Read the apps file and keep the catalog in memory for the rest of the run.
+
+        The file is only read again if it was modified since it was last read or
+        written by the downloader. An apps file with a .db, .sqlite or .sqlite3
+        extension is a SQLite catalog, see catalog_store.
+
+        Returns:
+            The list of app entries
+
+        Raises:
+            FileNotFoundError: If the apps file does not exist
+            json.JSONDecodeError: If the apps file is not valid JSON
+        """
+        if is_sqlite_catalog(self.apps_file):
+            apps_data = self._open_catalog_store().load()
+            with self._apps_file_lock:
+                self.apps_data = apps_data
+                self._apps_index = {app.get('uid'): app for app in apps_data}
+                self._pending_updates = 0
+                self._pending_checks = 0
+            return apps_data
+
+        mtime_ns = os.stat(self.apps_file).st_mtime_ns
+        with self._apps_file_lock:
+            if self.apps_data is not None and mtime_ns == self._apps_file_mtime_ns:
+                return self.apps_data
+
+        with open(self.apps_file, 'r', encoding='utf-8') as file:
+            apps_data = json.load(file)
+
+        with self._apps_file_lock:
+            self.apps_data = apps_data
+            self._apps_file_mtime_ns = mtime_ns
+            self._apps_index = {app.get('uid'): app for app in apps_data}
+            self._pending_updates = 0
+            self._pending_checks = 0
+            self._changed_fields = {}
+        return apps_data
+
+    def _record_change(self, uid, fields: Optional[Iterable[str]]) -> None:
+        """
+        Remember which fields of an app this run changed, to merge them into an apps file edited meanwhile.
+
+        Must be called with the apps file lock held.
+
+        Args:
+            uid: The app's unique identifier
+            fields: The changed fields, None for an app added by this run
+        """
+        if fields is None or self._changed_fields.get(uid, set()) is None:
+            self._changed_fields[uid] = None
+        else:
+            self._changed_fields.setdefault(uid, set()).update(fields)
+
+    def _merge_apps_file(self) -> None:
+        """
+        Fold the changes made to the apps file since it was read into the in-memory catalog.
+
+        Hand edits made during a long run, such as apps added, removed or
+        reconfigured, are kept. Only the fields this run changed are taken from
+        memory. Must be called with the apps file lock held.
+
+        Raises:
+            json.JSONDecodeError: If the apps file is not valid JSON
+        """
+        try:
+            mtime_ns = os.stat(self.apps_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns == self._apps_file_mtime_ns:
+            return
+
+        with open(self.apps_file, 'r', encoding='utf-8') as file:
+            apps_data = json.load(file)
+        self.logger.info(f"{self.apps_file} changed during the run, merging its changes")
+
+        apps_index = {app.get('uid'): app for app in apps_data}
+        for uid, fields in self._changed_fields.items():
+            app = self._apps_index.get(uid)
+            if app is None:
+                continue
+            if uid not in apps_index:
+                # Apps removed from the file stay removed, unless this run added them
+                if fields is None:
+                    apps_data.append(app)
+                    apps_index[uid] = app
+                continue
+            for field in (app if fields is None else fields):
+                if field in app:
+                    apps_index[uid][field] = app[field]
+
+        self.apps_data = apps_data
+        self._apps_index = apps_index
+
+    def _open_catalog_store(self, create: bool = False) -> SqliteCatalogStore:
+        """
+        Open the SQLite catalog, once per downloader.
+
+        Args:
+            create: Create the database if it does not exist
+
+        Returns:
+            The catalog store
+
+        Raises:
+            FileNotFoundError: If the database does not exist and create is False,
+                rather than letting sqlite3 create an empty one
+        """
+        if self._catalog_store is None:
+            if not create and not os.path.exists(self.apps_file):
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.apps_file)
+            self._catalog_store = SqliteCatalogStore(self.apps_file)
+        return self._catalog_store
+
+    def update_apps_file(self, uid: str, new_version: str, updated_time: str, **fields) -> bool:
+        """
+        Update the in-memory catalog with new version information.
+
+        Changes are written to the apps file by flush_apps_file(), either at the end
+        of the run or every ``checkpoint`` updates. A SQLite catalog is updated
+        right away, in a transaction of its own.
 
         Args:
             uid: The app's unique identifier
             new_version: The new app version
             updated_time: The update timestamp
+            fields: Additional fields to set on the app entry
 
         Returns:
             True if update was successful, False otherwise
         """
         try:
-            # Read current data
-            with open(self.apps_file, 'r', encoding='utf-8') as file:
-                apps_data = json.load(file)
-
-            # Find and update the app entry
-            app_updated = False
-            for app in apps_data:
-                if app['uid'] == uid:
-                    app['version'] = new_version
-                    app['updated_time'] = updated_time
-                    app_updated = True
-                    break
-
-            if not app_updated:
-                self.logger.warning("App %s not found in %s", uid, self.apps_file)
-                return False
-
-            # Write updated data back to file
-            with open(self.apps_file, 'w', encoding='utf-8') as file:
-                json.dump(apps_data, file, indent=4)
+            if self.apps_data is None:
+                self.load_apps_file()
+
+            # Workers may finish concurrently
+            with self.metrics.phase("apps_file_update", uid), self._apps_file_lock:
+                app = self._apps_index.get(uid)
+                if app is None:
+                    self.logger.warning("App %s not found in %s", uid, self.apps_file)
+                    return False
+
+                app['version'] = new_version
+                app['updated_time'] = updated_time
+                app.update(fields)
+                if self._catalog_store is not None:
+                    self._catalog_store.update(app)
+                    checkpoint_reached = False
+                else:
+                    self._record_change(uid, ['version', 'updated_time', *fields])
+                    self._pending_updates += 1
+                    checkpoint_reached = self.checkpoint and self._pending_updates >= self.checkpoint
 
-            self.logger.info("Updated %s with new version for %s: %s", self.apps_file, uid, new_version)
+            self.logger.info("Recorded new version for %s: %s", uid, new_version)
+            if checkpoint_reached:
+                return self.flush_apps_file()
             return True
 
         except Exception as e:
             self.logger.error("Error updating apps file: %s", str(e))
             return False
 
+    def mark_checked(self, uid: str) -> None:
+        """
+        Record in the in-memory catalog that an app was checked and is up to date.
+
+        The check time is saved by the next flush of the apps file, it does not
+        count towards ``checkpoint``.
+
+        Args:
+            uid: The app's unique identifier
+        """
+        with self._apps_file_lock:
+            app = self._apps_index.get(uid)
+            if app is not None:
+                app['last_checked'] = self._get_check_time()
+                if self._catalog_store is not None:
+                    self._catalog_store.update(app)
+                else:
+                    self._record_change(uid, ['last_checked'])
+                    self._pending_checks += 1
+
+    @staticmethod
+    def _get_check_time() -> str:
+        """Return the current UTC time in the format of the ``last_checked`` field."""
+        return datetime.datetime.utcnow().isoformat() + "Z"
+
+    def _is_due(self, app: Dict, now: datetime.datetime) -> bool:
+        """
+        Tell whether an app must be checked, from its ``last_checked`` time and check interval.
+
+        The interval is the ``check_interval`` field of the app entry, in seconds, or
+        the global ``check_interval``. Apps never checked are always due.
+
+        Args:
+            app: The app entry from the apps file
+            now: The current UTC time
+
+        Returns:
+            True if the app is due for a version check
+        """
+        try:
+            interval = int(app.get('check_interval', self.check_interval) or 0)
+        except (TypeError, ValueError):
+            self.logger.warning(f"Invalid check_interval for app {app.get('uid')}, using {self.check_interval}")
+            interval = self.check_interval
+        if interval <= 0 or not app.get('last_checked'):
+            return True
+        try:
+            last_checked = datetime.datetime.fromisoformat(str(app['last_checked']).rstrip("Z"))
+        except ValueError:
+            return True
+        if last_checked.tzinfo is not None:
+            # Hand-edited times may carry a UTC offset, now is naive UTC
+            last_checked = last_checked.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return (now - last_checked).total_seconds() >= interval
+
+    def _get_due_apps(self, apps_data: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split the catalog into the apps due for a version check and the others.
+
+        Args:
+            apps_data: The app entries from the apps file
+
+        Returns:
+            Tuple of (due_apps, pending_apps), both in the order of the apps file
+        """
+        now = datetime.datetime.utcnow()
+        due_apps, pending_apps = [], []
+        for app in apps_data:
+            (due_apps if self._is_due(app, now) else pending_apps).append(app)
+        return due_apps, pending_apps
+
+    def flush_apps_file(self) -> bool:
+        """
+        Write pending catalog changes to the apps file.
+
+        The catalog is written to a temporary file in the same directory which then
+        atomically replaces the apps file, so a crash never leaves it truncated. If
+        the apps file was modified since it was read, its changes are merged first.
+        A SQLite catalog is written in a single transaction.
+
+        Returns:
+            True if the apps file is up to date, False otherwise
+        """
+        with self._apps_file_lock:
+            if not self._pending_updates and not self._pending_checks:
+                return True
+
+            try:
+                with self.metrics.phase("apps_file_update"):
+                    if is_sqlite_catalog(self.apps_file):
+                        self._open_catalog_store(create=True).save(self.apps_data)
+                    else:
+                        self._merge_apps_file()
+                        write_json_atomic(self.apps_file, self.apps_data)
+                        self._apps_file_mtime_ns = os.stat(self.apps_file).st_mtime_ns
+            except Exception as e:
+                self.logger.error("Error writing apps file: %s", str(e))
+                return False
+
+            self.logger.info("Saved %d update(s) to %s", self._pending_updates, self.apps_file)
+            self._pending_updates = 0
+            self._pending_checks = 0
+            self._changed_fields = {}
+            return True
+
+    def get_catalog_page(self, offset: int) -> Optional[Dict]:
+        """
+        Retrieve one page of the Splunkbase app listing.
+
+        Args:
+            offset: Position of the first app of the page
+
+        Returns:
+            The page, with the listing 'total' and its 'results', or None if retrieval fails
+        """
+        params = dict(parse_qsl(self.sync_filter))
+        params.update({"offset": offset, "limit": self.CATALOG_PAGE_SIZE})
+        try:
+            with self.metrics.phase("catalog_sync"):
+                response = self._request("GET", self.CATALOG_API, params=params)
+            if response.status_code != 200:
+                self.logger.error(f"Failed to list apps at offset {offset}: {response.status_code}")
+                return None
+            return response.json()
+        except Exception as e:
+            self.logger.error(f"Error listing apps at offset {offset}: {str(e)}")
+            return None
+
+    def sync_catalog(self) -> Tuple[int, int]:
+        """
+        Materialize or refresh the apps file from the Splunkbase app listing.
+
+        The first page gives the size of the listing, the other pages are fetched
+        concurrently by ``workers`` threads. Apps already in the catalog keep their
+        version fields and get their name and appid refreshed. New apps are added
+        without a version, so that the next run downloads their latest release.
+        Apps are never removed.
+
+        Returns:
+            Tuple of (added, refreshed) app counts
+        """
+        if not self.cookies:
+            self.logger.error("Not authenticated. Call authenticate() first.")
+            return 0, 0
+
+        first_page = self.get_catalog_page(0)
+        if first_page is None:
+            return 0, 0
+
+        offsets = range(self.CATALOG_PAGE_SIZE, int(first_page.get("total") or 0), self.CATALOG_PAGE_SIZE)
+        self.logger.info(f"Listing {first_page.get('total')} apps in {len(offsets) + 1} page(s)...")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pages = [first_page] + list(executor.map(self.get_catalog_page, offsets))
+        if None in pages:
+            self.logger.warning("The app listing is incomplete, only the retrieved pages are synchronized")
+
+        try:
+            self.load_apps_file()
+        except FileNotFoundError:
+            with self._apps_file_lock:
+                self.apps_data, self._apps_index = [], {}
+
+        added = refreshed = 0
+        with self._apps_file_lock:
+            for page in pages:
+                for result in (page or {}).get("results", []):
+                    entry = {"name": result.get("title"), "uid": result.get("uid"), "appid": result.get("appid")}
+                    app = self._apps_index.get(entry["uid"])
+                    if app is None:
+                        self.apps_data.append(entry)
+                        self._apps_index[entry["uid"]] = entry
+                        self._record_change(entry["uid"], None)
+                        added += 1
+                    elif any(app.get(key) != value for key, value in entry.items()):
+                        app.update(entry)
+                        self._record_change(entry["uid"], entry)
+                        refreshed += 1
+            self._pending_updates += added + refreshed
+
+        self.logger.info(f"Catalog synchronized: {added} app(s) added, {refreshed} refreshed")
+        self.flush_apps_file()
+        return added, refreshed
+
+    def run_forever(self) -> None:
+        """
+        Authenticate once, then check all apps every ``interval`` seconds until interrupted.
+
+        The session, connection pool and in-memory catalog are kept between runs.
+        Metrics are exported and reset after every run.
+        """
+        self._exit_on_sigterm()
+        self.authenticate()
+        while True:
+            started = time.monotonic()
+            try:
+                downloaded, skipped = self.check_and_update_apps()
+                self.logger.info(f"Run completed: {len(downloaded)} app(s) downloaded, {len(skipped)} skipped")
+                self.export_metrics()
+            except Exception as e:
+                self.logger.error(f"Run failed: {str(e)}")
+            self.metrics = RunMetrics()
+            # The next run may renew the session once more, it can expire in between
+            self._fresh_cookies = None
+
+            delay = max(0.0, self.interval - (time.monotonic() - started))
+            self.logger.info(f"Next run in {delay:.0f}s")
+            time.sleep(delay)
+
+    def _exit_on_sigterm(self) -> None:
+        """
+        Turn SIGTERM into SystemExit, so that a daemon stopped by its service manager
+        still writes the pending catalog, metadata cache and manifest changes of the current run.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def handle_sigterm(signum, frame):
+            # A second SIGTERM must not interrupt the final writes
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            self.logger.info("Received SIGTERM, stopping")
+            raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+    def export_metrics(self) -> None:
+        """Log the run summary and export it to ``metrics_file`` if configured."""
+        self.logger.info(self.metrics.format_summary())
+        if not self.metrics_file:
+            return
+        try:
+            self.metrics.export(self.metrics_file, self.metrics_format)
+            self.logger.info(f"Metrics written to {self.metrics_file}")
+        except Exception as e:
+            self.logger.error(f"Error writing metrics file: {str(e)}")
+
+    def _record_package(self, path: str, sha256: str) -> None:
+        """Record a package that landed in the output directory in the manifest and the index."""
+        entry = self.manifest.record(path, sha256)
+        self.output_index.add(os.path.basename(path), entry['size'], entry['mtime_ns'])
+
+    def _get_package_fields(self, app_name: str, app_id: str, app_version: str) -> Dict:
+        """Return the checksum and size of a downloaded package, to be stored in the catalog."""
+        entry = self.manifest.get(self._get_file_name(app_name, app_id, app_version))
+        if not entry:
+            return {}
+        return {'sha256': entry['sha256'], 'size': entry['size']}
+
+    def _get_existing_updated_time(self, app_name: str, app_id: str, app_version: str) -> Optional[str]:
+        """
+        Return the update timestamp of a verified package that is already in the output directory.
+
+        A run that stops before its catalog is written leaves the package of an update
+        on disk while the catalog still holds the old version. Such a package is
+        recorded as downloaded, dated by its modification time.
+
+        Args:
+            app_name: The name of the app
+            app_id: The app's unique identifier
+            app_version: The version of the package
+
+        Returns:
+            The package modification time as an HTTP date, None if the package is not recorded
+        """
+        file_name = self._get_file_name(app_name, app_id, app_version)
+        if file_name not in self.output_index or not self.manifest.get(file_name):
+            return None
+        try:
+            mtime = os.path.getmtime(os.path.join(self.output, file_name))
+        except OSError:
+            return None
+        self.logger.info(f"Recording existing package {file_name} in the apps file")
+        return email.utils.formatdate(mtime, usegmt=True)
+
+    def save_manifest(self) -> None:
+        """Write the package manifest if it changed during the run."""
+        try:
+            self.manifest.save()
+        except Exception as e:
+            self.logger.error(f"Error writing manifest: {str(e)}")
+
+    def _plan_downloads(self, app: Dict, versions: List[str],
+                        pinned_version: Optional[str]) -> Tuple[Tuple[bool, str], List[Tuple[str, bool]]]:
+        """
+        Decide which packages of an app to download once its versions are known.
+
+        Args:
+            app: The app entry from the apps file
+            versions: The selected versions, latest first
+            pinned_version: The version the app is pinned to, if any
+
+        Returns:
+            Tuple of (result, downloads): the (downloaded, app_label) result of the
+            app unless its update gets downloaded, and the (version, update) packages
+            to download, update being True for the new latest version
+        """
+        name = app.get('name')
+        uid = app.get('uid')
+        current_version = app.get('version')
+        latest_version = versions[0] if versions else None
+
+        if not latest_version:
+            self.logger.warning(f"Could not retrieve latest version for {uid}")
+            return (False, f"{name}_{uid}_{current_version}"), []
+
+        # Older releases requested by the app entry are downloaded as well
+        downloads = [(version, False) for version in versions[1:]]
+
+        # Check if update is needed
+        if latest_version != current_version:
+            self.logger.info(f"Update available for {uid}: {current_version} → {latest_version}")
+            return (False, f"{name}_{uid}_{latest_version}"), [(latest_version, True)] + downloads
+
+        self.logger.info(f"App {uid} is up to date (version {current_version})")
+        if pinned_version is None:
+            self.mark_checked(uid)
+        return (False, f"{name}_{uid}_{current_version}"), downloads
+
+    def _lookup_app(self, app: Dict) -> Tuple[Tuple[bool, str], List[Tuple[str, bool]]]:
+        """
+        Look up the versions of an app, the first stage of the update pipeline.
+
+        Args:
+            app: The app entry from the apps file
+
+        Returns:
+            Tuple of (result, downloads), see _plan_downloads
+        """
+        try:
+            pinned_version, constraint = self._get_version_policy(app)
+            count, compatibility = self._get_release_selection(app)
+        except ValueError as e:
+            self.logger.error(f"Skipping app {app.get('uid')}: {str(e)}")
+            return (False, f"{app.get('name')}_{app.get('uid')}_{app.get('version')}"), []
+
+        if pinned_version is not None:
+            # Pinned apps never need a version lookup
+            return self._plan_downloads(app, [pinned_version], pinned_version)
+
+        # Get latest versions from Splunkbase
+        versions = self.get_versions(app.get('uid'), constraint, count, compatibility) or []
+        return self._plan_downloads(app, versions, pinned_version)
+
+    def _download_version(self, app: Dict, version: str, update: bool) -> Optional[Tuple[bool, str]]:
+        """
+        Download one package of an app, the second stage of the update pipeline.
+
+        Args:
+            app: The app entry from the apps file
+            version: The version to download
+            update: True if version is the new latest version of the app
+
+        Returns:
+            The (downloaded, app_label) result of the app for an update, None otherwise
+        """
+        name = app.get('name')
+        uid = app.get('uid')
+        updated_time = self.download_app(name, uid, version)
+        if not update:
+            return None
+        if not updated_time:
+            updated_time = self._get_existing_updated_time(name, uid, version)
+
+        if updated_time:
+            # Update app info in configuration file
+            self.update_apps_file(uid, version, updated_time, last_checked=self._get_check_time(),
+                                  **self._get_package_fields(name, uid, version))
+            return True, f"{name}_{uid}_{version}"
+        return False, f"{name}_{uid}_{version}"
+
+    def _run_pipeline(self, apps_data: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Check apps for updates and download them in two pipelined stages.
+
+        ``lookup_workers`` threads look up versions and feed a queue of at most
+        ``download_queue`` packages, drained by ``download_workers`` threads. Version
+        lookups therefore never wait for downloads, and downloads start as soon as
+        the first update is found. Packages that do not fit on the output volume are
+        deferred to the end of the run.
+
+        Args:
+            apps_data: The app entries to process
+
+        Returns:
+            The (downloaded, app_label) result of each app, in the order of apps_data
+        """
+        results: List[Optional[Tuple[bool, str]]] = [None] * len(apps_data)
+        downloads: queue.Queue = queue.Queue(maxsize=self.download_queue)
+        deferred: List[Tuple[int, int, Dict, str, bool]] = []
+
+        def lookup(index: int, app: Dict) -> None:
+            try:
+                results[index], versions = self._lookup_app(app)
+            except Exception as e:
+                self.logger.error(f"Error looking up {app.get('uid')}: {str(e)}")
+                results[index] = (False, f"{app.get('name')}_{app.get('uid')}_{app.get('version')}")
+                return
+            for version, update in versions:
+                downloads.put((index, app, version, update))
+
+        def download() -> None:
+            while True:
+                job = downloads.get()
+                if job is None:
+                    return
+                index, app, version, update = job
+                try:
+                    result = self._download_version(app, version, update)
+                    if result is not None:
+                        results[index] = result
+                except InsufficientSpaceError as e:
+                    self.logger.warning(f"Deferring {app.get('uid')} v{version}: {e.strerror}")
+                    deferred.append((e.size, index, app, version, update))
+                except Exception as e:
+                    self.logger.error(f"Error downloading {app.get('uid')} v{version}: {str(e)}")
+
+        download_threads = [threading.Thread(target=download, daemon=True) for _ in range(self.download_workers)]
+        for thread in download_threads:
+            thread.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.lookup_workers) as executor:
+                list(executor.map(lookup, range(len(apps_data)), apps_data))
+        finally:
+            for _ in download_threads:
+                downloads.put(None)
+            for thread in download_threads:
+                thread.join()
+
+        # Packages that did not fit get another chance once every other download is over, smallest first
+        for _, index, app, version, update in sorted(deferred, key=lambda job: job[0]):
+            try:
+                result = self._download_version(app, version, update)
+                if result is not None:
+                    results[index] = result
+            except InsufficientSpaceError as e:
+                self.logger.error(f"Skipping {app.get('uid')} v{version}: {e.strerror}")
+        return results
+
     def check_and_update_apps(self) -> Tuple[List[str], List[str]]:
         """
         Check all apps in the configuration for updates and download new versions.
 
+        Only apps due for a check, see ``check_interval``, are processed; the
+        others are reported as skipped. Versions are looked up and packages
+        downloaded by two pipelined pools of threads, see _run_pipeline; results
+        are reported in the order of the apps file regardless of completion order.
+
         Returns:
             Tuple of (downloaded_apps, skipped_apps)
         """
@@ -241,42 +1795,24 @@ class SplunkbaseDownloader:
 
         try:
             # Read apps configuration
-            with open(self.apps_file, 'r') as file:
-                apps_data = json.load(file)
-
-            self.logger.info(f"Checking updates for {len(apps_data)} apps...")
+            apps_data = self.load_apps_file()
+            self.load_metadata_cache()
+            self.output_index.load(self.manifest if self.trust_manifest else None)
 
-            # Process each app
-            for app in apps_data:
-                name = app.get('name')
-                uid = app.get('uid')
-                current_version = app.get('version')
+            due_apps, pending_apps = self._get_due_apps(apps_data)
+            self.logger.info(f"Checking updates for {len(due_apps)} of {len(apps_data)} apps with "
+                             f"{self.lookup_workers} lookup and {self.download_workers} download worker(s)...")
 
-                # Get latest version from Splunkbase
-                latest_version = self.get_latest_version(uid)
+            results = self._run_pipeline(due_apps)
+            results += [(False, f"{app.get('name')}_{app.get('uid')}_{app.get('version')}") for app in pending_apps]
 
-                if not latest_version:
-                    self.logger.warning(f"Could not retrieve latest version for {uid}")
-                    skipped_apps.append(f"{name}_{uid}_{current_version}")
-                    continue
-
-                # Check if update is needed
-                if latest_version != current_version:
-                    self.logger.info(f"Update available for {uid}: {current_version} → {latest_version}")
-
-                    # Download new version
-                    updated_time = self.download_app(name, uid, latest_version)
-
-                    if updated_time:
-                        # Update app info in configuration file
-                        self.update_apps_file(uid, latest_version, updated_time)
-                        downloaded_apps.append(f"{name}_{uid}_{latest_version}")
-                    else:
-                        skipped_apps.append(f"{name}_{uid}_{latest_version}")
+            for downloaded, label in results:
+                if downloaded:
+                    downloaded_apps.append(label)
                 else:
-                    self.logger.info(f"App {uid} is up to date (version {current_version})")
-                    skipped_apps.append(f"{name}_{uid}_{current_version}")
+                    skipped_apps.append(label)
 
+            self.metrics.finish(downloaded_apps, skipped_apps)
             return downloaded_apps, skipped_apps
 
         except FileNotFoundError:
@@ -288,19 +1824,51 @@ class SplunkbaseDownloader:
         except Exception as e:
             self.logger.error(f"Error checking for updates: {str(e)}")
             return [], []
+        finally:
+            # Persist whatever was updated, even if the run was interrupted
+            if self.apps_data is not None:
+                self.flush_apps_file()
+            self.save_metadata_cache()
+            self.save_manifest()
 
 
 def main():
     """Main entry point for the script."""
+    downloader = None
     try:
         # Create downloader instance
         downloader = SplunkbaseDownloader()
 
-        # Authenticate
-        downloader.authenticate()
+        if downloader.sync:
+            downloader.authenticate()
+            added, refreshed = downloader.sync_catalog()
+            print(f"\nCatalog synchronized: {added} app(s) added, {refreshed} refreshed")
+            return
+
+        if downloader.engine == "async":
+            # Imported lazily so the sync engine does not require aiohttp
+            try:
+                from .async_downloader import AsyncSplunkbaseDownloader
+            except ImportError:
+                from async_downloader import AsyncSplunkbaseDownloader
+
+            downloader.close()
+            downloader = AsyncSplunkbaseDownloader()
+            if downloader.daemon:
+                asyncio.run(downloader.run_forever())
+                return
+            downloaded, skipped = asyncio.run(downloader.run())
+        elif downloader.daemon:
+            downloader.run_forever()
+            return
+        else:
+            # Authenticate
+            downloader.authenticate()
+
+            # Check for updates and download new versions
+            downloaded, skipped = downloader.check_and_update_apps()
 
-        # Check for updates and download new versions
-        downloaded, skipped = downloader.check_and_update_apps()
+        downloader.export_metrics()
 
         # Output results
         if downloaded:
@@ -320,6 +1888,9 @@ def main():
     except Exception as e:
         print(f"\nAn error occurred during execution: {str(e)}")
         sys.exit(1)
+    finally:
+        if downloader:
+            downloader.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
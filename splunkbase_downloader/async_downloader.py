@@ -0,0 +1,762 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+try:
+    from .app_downloader import SplunkbaseDownloader
+    from .disk_space import InsufficientSpaceError
+    from .file_utils import open_locked, replace_locked, write_at
+    from .manifest import hash_file
+    from .rate_limiter import BandwidthLimiter
+    from .metrics import RunMetrics
+    from .versioning import VersionConstraint
+except ImportError:
+    from app_downloader import SplunkbaseDownloader
+    from disk_space import InsufficientSpaceError
+    from file_utils import open_locked, replace_locked, write_at
+    from manifest import hash_file
+    from rate_limiter import BandwidthLimiter
+    from metrics import RunMetrics
+    from versioning import VersionConstraint
+
+
+class AsyncSplunkbaseDownloader(SplunkbaseDownloader):
+    """
+    Asyncio flavour of SplunkbaseDownloader.
+
+    All network calls run as coroutines on a single event loop and share one
+    aiohttp client session. Version lookups and downloads are pipelined, see
+    _run_pipeline. Configuration handling is inherited from SplunkbaseDownloader.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initialize the downloader with configuration files.
+
+        Args:
+            kwargs: Configuration parameters
+        """
+        super().__init__(**kwargs)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._async_auth_lock: Optional[asyncio.Lock] = None
+
+    def _create_session(self) -> None:
+        """The aiohttp session is bound to the event loop and is created in run()."""
+        return None
+
+    def close(self) -> None:
+        """Close the catalog database, the aiohttp session is closed when run() returns."""
+        self._close_catalog_store()
+
+    def _set_session_cookies(self, cookies: Dict[str, str]) -> None:
+        """
+        Store authentication cookies on the session.
+
+        Cookies updated without a response URL are shared across hosts, which
+        covers both splunkbase.splunk.com and api.splunkbase.splunk.com.
+
+        Args:
+            cookies: The authentication cookies
+        """
+        self.cookies = cookies
+        self.session.cookie_jar.clear()
+        self.session.cookie_jar.update_cookies(cookies)
+
+    async def authenticate(self, force: bool = False) -> None:
+        """
+        Authenticate with Splunkbase using credentials from the config file.
+
+        Args:
+            force: Ignore the cached session and log in again
+
+        Raises:
+            Exception: If authentication fails
+        """
+        if not force and self._load_session_file():
+            self.logger.info("Reusing cached Splunkbase session")
+            return
+
+        try:
+            payload = {
+                'username': self.args_splunkbase.get('username', None),
+                'password': self.args_splunkbase.get('password', None)
+            }
+
+            self.logger.info("Authenticating with Splunkbase...")
+            with self.metrics.phase("login"):
+                response = await self.session.post(self.LOGIN_API, data=payload)
+
+            async with response:
+                if response.status == 200:
+                    self._set_session_cookies({name: morsel.value for name, morsel in response.cookies.items()})
+                    self._fresh_cookies = self.cookies
+                    self._save_session_file()
+                    self.logger.info("Authentication successful")
+                else:
+                    raise Exception(f"Authentication failed with status code: {response.status}")
+        except Exception as e:
+            self.logger.error(f"Authentication error: {str(e)}")
+            raise
+
+    async def _reauthenticate(self, cookies: Optional[Dict[str, str]], status: int) -> bool:
+        """
+        Log in again after Splunkbase rejected the session.
+
+        Args:
+            cookies: The cookies of the rejected request
+            status: The status code of the rejected request
+
+        Returns:
+            True if the request should be sent again with the current session
+        """
+        async with self._async_auth_lock:
+            if self.cookies is not cookies:
+                return True
+            if self._is_forbidden(cookies, status):
+                return False
+            self.logger.info("Splunkbase session rejected, logging in again")
+            await self.authenticate(force=True)
+            return True
+
+    async def _request(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """
+        Send a request on the shared session, logging in again once on 401/403.
+
+        A 403 on a session logged in during this run is returned as is, see _is_forbidden.
+        The caller is responsible for releasing the response, e.g. with ``async with``.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            kwargs: Keyword arguments for aiohttp.ClientSession.request
+
+        Returns:
+            The response
+        """
+        cookies = self.cookies
+        response = await self._send(method, url, **kwargs)
+        if response.status in (401, 403) and await self._reauthenticate(cookies, response.status):
+            response.release()
+            response = await self._send(method, url, **kwargs)
+        return response
+
+    async def _send(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """
+        Send a request through the rate limiter, retrying throttled and failed attempts.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            kwargs: Keyword arguments for aiohttp.ClientSession.request
+
+        Returns:
+            The last response
+        """
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async()
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.rate_limiter.release(throttled=True)
+                if attempt >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                self.logger.warning(f"Request to {url} failed ({str(e)}), retrying in {delay:.1f}s")
+            except asyncio.CancelledError:
+                # A cancelled request, e.g. a sibling segment of a failed download, says nothing about the server
+                self.rate_limiter.release()
+                raise
+            except BaseException:
+                # Other errors are not retried, but their slot must still be given back
+                self.rate_limiter.release(throttled=True)
+                raise
+            else:
+                throttled = self.retry_policy.is_retryable(response.status)
+                self.rate_limiter.release(throttled=throttled)
+                if not throttled or attempt >= self.retry_policy.max_retries:
+                    return response
+                delay = self.retry_policy.get_delay(attempt, response.headers.get("Retry-After"))
+                self.logger.warning(f"Request to {url} returned {response.status}, retrying in {delay:.1f}s")
+                response.release()
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_releases(self, uid: str) -> Optional[List[Dict]]:
+        """
+        Retrieve the release list of an app from Splunkbase, newest first.
+
+        Args:
+            uid: The app's unique identifier
+
+        Returns:
+            The list of releases or None if retrieval fails
+        """
+        if not self.cookies:
+            self.logger.error("Not authenticated. Call authenticate() first.")
+            return None
+
+        url = self.VERSION_API.format(uid=uid)
+
+        try:
+            with self.metrics.phase("version_lookup", uid):
+                response = await self._request("GET", url, headers=self._get_cache_headers(uid))
+
+            async with response:
+                if response.status == 304:
+                    return self._get_cached_releases(uid)
+                elif response.status == 200:
+                    data = await response.json(content_type=None)
+                    if not self._is_release_list(data):
+                        self.logger.error(f"Unexpected release list for {uid}")
+                        return None
+                    self._cache_releases(uid, response.headers, data)
+                    return data
+                else:
+                    self.logger.error(f"Error retrieving app version for {uid}: Status code {response.status}")
+                    return None
+
+        except Exception as e:
+            self.logger.error(f"Error getting latest version for {uid}: {str(e)}")
+            return None
+
+    async def get_latest_version(self, uid: str, constraint: Optional[VersionConstraint] = None) -> Optional[str]:
+        """
+        Retrieve the latest version of an app from Splunkbase.
+
+        Args:
+            uid: The app's unique identifier
+            constraint: Only consider the releases satisfying this constraint
+
+        Returns:
+            The latest version string or None if retrieval fails
+        """
+        return self._get_latest_release_name(uid, await self.get_releases(uid), constraint)
+
+    async def get_versions(self, uid: str, constraint: Optional[VersionConstraint] = None, count: int = 1,
+                           compatibility: Optional[VersionConstraint] = None) -> Optional[List[str]]:
+        """
+        Retrieve several versions of an app from a single release list request.
+
+        Args:
+            uid: The app's unique identifier
+            constraint: Only consider the releases satisfying this constraint
+            count: Number of versions to return, 0 for all of them
+            compatibility: Only consider the releases supporting a Splunk version satisfying this constraint
+
+        Returns:
+            The version strings, newest first, or None if retrieval fails
+        """
+        return self._select_release_names(uid, await self.get_releases(uid), constraint, count, compatibility)
+
+    async def download_app(self, app_name: str, app_id: str, app_version: str) -> Optional[str]:
+        """
+        Download a specific version of an app if it doesn't already exist.
+
+        Args:
+            app_name: The name of the app
+            app_id: The app's unique identifier
+            app_version: The version to download
+
+        Returns:
+            The update timestamp if successful, None otherwise
+
+        Raises:
+            InsufficientSpaceError: If the package does not fit on the output volume
+        """
+        if not self.cookies:
+            self.logger.error("Not authenticated. Call authenticate() first.")
+            return None
+
+        # Verifying an existing package may hash it, keep that off the event loop
+        path = await asyncio.to_thread(self._get_download_path, app_name, app_id, app_version)
+        if not path:
+            return None
+
+        download_url = self.DOWNLOAD_API.format(app_id=app_id, version=app_version)
+        part_path = f"{path}.part"
+
+        try:
+            # The lock keeps concurrent workers and processes off the same partial file
+            part = open_locked(part_path)
+            if part is None:
+                self.logger.info(f"Skipping download of {path} (already being downloaded)")
+                return None
+
+            with part:
+                if os.path.exists(path):
+                    # Drop the partial file this call created
+                    os.remove(part_path)
+                    self.logger.info(f"Skipping download of {path} (downloaded concurrently)")
+                    return None
+
+                self.logger.info(f"Downloading {path}...")
+                try:
+                    result = await self._download_to_part(part, part_path, path, download_url, app_id)
+                except BaseException:
+                    self._discard_empty_part(part, part_path)
+                    raise
+                if not result:
+                    self._discard_empty_part(part, part_path)
+                    return None
+
+                # Only a complete, verified and fsync'd package gets its final name
+                updated_time, digest = result
+                replace_locked(part, part_path, path)
+                self._record_package(path, digest.hexdigest())
+
+            self.logger.info(f"Successfully downloaded {path}")
+            return updated_time
+
+        except InsufficientSpaceError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error downloading {app_id} v{app_version}: {str(e)}")
+            return None
+
+    async def _download_to_part(self, part, part_path: str, path: str, download_url: str, app_id: str) -> Optional[Tuple[str, Any]]:
+        """
+        Stream a package into its locked partial file, resuming it when possible.
+
+        Args:
+            part: The locked partial file
+            part_path: The partial file path
+            path: The package path, used for logging
+            download_url: The package download URL
+            app_id: The app's unique identifier
+
+        Returns:
+            Tuple of (updated_time, digest) once the partial file holds the complete
+            package and is fsync'd, None otherwise
+        """
+        limiter = BandwidthLimiter(self.download_bandwidth_limit)
+        if self.segments > 1 and not part.seek(0, os.SEEK_END):
+            target = await self._probe_ranges(download_url, app_id)
+            if target is not None:
+                return await self._download_segmented(part, part_path, path, app_id, limiter, *target)
+
+        for _ in range(2):
+            offset = part.seek(0, os.SEEK_END)
+
+            with self.metrics.phase("download_ttfb", app_id):
+                response = await self._request("GET", download_url, headers=self._get_range_headers(offset))
+
+            async with response:
+                if response.status == 416 and offset:
+                    # The partial file no longer matches the package, start over
+                    self.logger.warning(f"Discarding stale partial download {part_path}")
+                    part.truncate(0)
+                    continue
+
+                mode = self._get_write_mode(response.status, response.headers, offset, path)
+                if not mode:
+                    self.logger.error(f"Failed to download {path}. Status code: {response.status}")
+                    return None
+                if mode == 'wb':
+                    part.seek(0)
+                    part.truncate()
+                    offset = 0
+
+                # Stream the package to disk, keeping disk I/O off the event loop
+                expected_size = self._get_expected_size(response.headers, offset)
+                reserved = await asyncio.to_thread(self._reserve_space, part, path, expected_size, offset)
+                held = 0
+                try:
+                    writer_budget = self._get_writer_budget()
+                    if writer_budget:
+                        await self.inflight_budget.acquire_async(writer_budget)
+                        held = writer_budget
+                    digest = await asyncio.to_thread(self._create_digest, part_path, mode)
+                    writer = self._open_writer(part)
+                    transfer_start = time.perf_counter()
+                    write_time = 0.0
+                    chunks = response.content.iter_chunked(self.chunk_size)
+                    async for chunk in self._limit_chunks_async(chunks, limiter, hold_budget=not held):
+                        write_start = time.perf_counter()
+                        await asyncio.to_thread(self._write_chunk, writer, digest, chunk)
+                        write_time += time.perf_counter() - write_start
+                        self.metrics.add_bytes(app_id, len(chunk))
+
+                    write_start = time.perf_counter()
+                    await asyncio.to_thread(self._sync_file, writer)
+                    write_time += time.perf_counter() - write_start
+                    self.metrics.add("transfer", time.perf_counter() - transfer_start - write_time, app_id)
+                    self.metrics.add("disk_write", write_time, app_id)
+
+                    if not self._check_part_size(part, expected_size, path):
+                        return None
+                    return self._get_updated_time(response.headers), digest
+                finally:
+                    self.inflight_budget.release(held)
+                    self.disk_space.release(reserved)
+
+        return None
+
+    async def _probe_ranges(self, download_url: str, app_id: str) -> Optional[Tuple[str, int, Any]]:
+        """
+        Ask the server whether a package can be downloaded in segments.
+
+        Args:
+            download_url: The package download URL
+            app_id: The app's unique identifier
+
+        Returns:
+            Tuple of (url, size, headers) of the package after redirects if it
+            qualifies for a segmented download, None otherwise
+        """
+        with self.metrics.phase("download_ttfb", app_id):
+            response = await self._request("HEAD", download_url, allow_redirects=True)
+        async with response:
+            return self._get_segmented_target(response.status, response.url, response.headers)
+
+    async def _download_segmented(self, part, part_path: str, path: str, app_id: str, limiter: BandwidthLimiter,
+                                  url: str, size: int, headers) -> Optional[Tuple[str, Any]]:
+        """
+        Download a package as concurrent byte ranges written in place into its partial file.
+
+        Args:
+            part: The locked, empty partial file
+            part_path: The partial file path
+            path: The package path, used for logging
+            app_id: The app's unique identifier
+            limiter: The bandwidth cap of this download, shared by its segments
+            url: The package URL, after redirects
+            size: The package size
+            headers: The HEAD response headers
+
+        Returns:
+            Tuple of (updated_time, digest) once the partial file holds the complete
+            package and is fsync'd, None otherwise
+        """
+        segments = self._get_segments(size)
+        reserved = await asyncio.to_thread(self._reserve_space, part, path, size, 0)
+        self.logger.info(f"Downloading {path} in {len(segments)} segments")
+        transfer_start = time.perf_counter()
+        tasks: List[asyncio.Future] = []
+        try:
+            await asyncio.to_thread(part.truncate, size)
+            tasks = [
+                asyncio.ensure_future(self._download_segment(part.fileno(), url, start, end, app_id, limiter))
+                for start, end in segments
+            ]
+            completed = all(await asyncio.gather(*tasks))
+        except BaseException:
+            # Stop the other segments before the partial file is closed, they write through its descriptor
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Which ranges landed is unknown, the partial file cannot be resumed
+            part.truncate(0)
+            raise
+        finally:
+            self.disk_space.release(reserved)
+        self.metrics.add("transfer", time.perf_counter() - transfer_start, app_id)
+        if not completed:
+            part.truncate(0)
+            return None
+
+        # Hash first, while the pages just written are still cached, then sync
+        write_start = time.perf_counter()
+        digest = await asyncio.to_thread(hash_file, part_path, self.chunk_size)
+        await asyncio.to_thread(self._sync_file, part)
+        self.metrics.add("disk_write", time.perf_counter() - write_start, app_id)
+
+        if not self._check_part_size(part, size, path):
+            return None
+        return self._get_updated_time(headers), digest
+
+    async def _download_segment(self, fd: int, url: str, start: int, end: int, app_id: str, limiter: BandwidthLimiter) -> bool:
+        """
+        Download the byte range [start, end] of a package into its partial file.
+
+        Args:
+            fd: File descriptor of the partial file
+            url: The package URL
+            start: First byte of the range
+            end: Last byte of the range
+            app_id: The app's unique identifier
+            limiter: The bandwidth cap of the download
+
+        Returns:
+            True if the whole range was written
+        """
+        response = await self._request("GET", url, headers={"Range": f"bytes={start}-{end}"})
+        async with response:
+            if not self._is_segment_response(response.status, response.headers, start, end):
+                self.logger.error(f"Failed to download bytes {start}-{end} of {app_id}. Status code: {response.status}")
+                return False
+            position = start
+            async for chunk in self._limit_chunks_async(response.content.iter_chunked(self.chunk_size), limiter):
+                await self._write_at(fd, chunk, position)
+                position += len(chunk)
+                self.metrics.add_bytes(app_id, len(chunk))
+        return position == end + 1
+
+    @staticmethod
+    async def _write_at(fd: int, chunk: bytes, position: int) -> None:
+        """
+        Write a chunk at a position of a file in a thread.
+
+        A cancelled download still waits for the write in progress, so that no
+        write outlives the file descriptor.
+        """
+        write = asyncio.ensure_future(asyncio.to_thread(write_at, fd, chunk, position))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            await write
+            raise
+
+    async def _limit_chunks_async(self, chunks, limiter: BandwidthLimiter, hold_budget: bool = True):
+        """
+        Yield the chunks of a download within the bandwidth caps and the in-flight budget.
+
+        A chunk holds its share of ``inflight_budget`` from the moment it is read until
+        the caller is done writing it, i.e. until the next chunk is requested.
+
+        Args:
+            chunks: Asynchronous iterator over the chunks of a response
+            limiter: The bandwidth cap of the download
+            hold_budget: Count every chunk against the budget, False if the download
+                already holds its share for the whole transfer
+        """
+        chunk_budget = self.chunk_size if hold_budget else 0
+        chunks = chunks.__aiter__()
+        while True:
+            if chunk_budget:
+                await self.inflight_budget.acquire_async(chunk_budget)
+            try:
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    return
+                yield chunk
+            finally:
+                self.inflight_budget.release(chunk_budget)
+            await self.bandwidth_limiter.consume_async(len(chunk))
+            await limiter.consume_async(len(chunk))
+
+    async def _lookup_app(self, app: Dict) -> Tuple[Tuple[bool, str], List[Tuple[str, bool]]]:
+        """
+        Look up the versions of an app, the first stage of the update pipeline.
+
+        Args:
+            app: The app entry from the apps file
+
+        Returns:
+            Tuple of (result, downloads), see _plan_downloads
+        """
+        try:
+            pinned_version, constraint = self._get_version_policy(app)
+            count, compatibility = self._get_release_selection(app)
+        except ValueError as e:
+            self.logger.error(f"Skipping app {app.get('uid')}: {str(e)}")
+            return (False, f"{app.get('name')}_{app.get('uid')}_{app.get('version')}"), []
+
+        if pinned_version is not None:
+            # Pinned apps never need a version lookup
+            return self._plan_downloads(app, [pinned_version], pinned_version)
+
+        # Get latest versions from Splunkbase
+        versions = await self.get_versions(app.get('uid'), constraint, count, compatibility) or []
+        return self._plan_downloads(app, versions, pinned_version)
+
+    async def _download_version(self, app: Dict, version: str, update: bool) -> Optional[Tuple[bool, str]]:
+        """
+        Download one package of an app, the second stage of the update pipeline.
+
+        Args:
+            app: The app entry from the apps file
+            version: The version to download
+            update: True if version is the new latest version of the app
+
+        Returns:
+            The (downloaded, app_label) result of the app for an update, None otherwise
+        """
+        name = app.get('name')
+        uid = app.get('uid')
+        updated_time = await self.download_app(name, uid, version)
+        if not update:
+            return None
+        if not updated_time:
+            updated_time = self._get_existing_updated_time(name, uid, version)
+
+        if updated_time:
+            # Update app info in configuration file
+            self.update_apps_file(uid, version, updated_time, last_checked=self._get_check_time(),
+                                  **self._get_package_fields(name, uid, version))
+            return True, f"{name}_{uid}_{version}"
+        return False, f"{name}_{uid}_{version}"
+
+    async def _run_pipeline(self, apps_data: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Check apps for updates and download them in two pipelined stages.
+
+        At most ``lookup_workers`` version lookups run at once and feed a queue of
+        at most ``download_queue`` packages, drained by ``download_workers`` tasks.
+        Packages that do not fit on the output volume are deferred to the end of the run.
+
+        Args:
+            apps_data: The app entries to process
+
+        Returns:
+            The (downloaded, app_label) result of each app, in the order of apps_data
+        """
+        results: List[Optional[Tuple[bool, str]]] = [None] * len(apps_data)
+        downloads: asyncio.Queue = asyncio.Queue(maxsize=self.download_queue)
+        semaphore = asyncio.Semaphore(self.lookup_workers)
+        deferred: List[Tuple[int, int, Dict, str, bool]] = []
+
+        async def lookup(index: int, app: Dict) -> None:
+            async with semaphore:
+                try:
+                    results[index], versions = await self._lookup_app(app)
+                except Exception as e:
+                    self.logger.error(f"Error looking up {app.get('uid')}: {str(e)}")
+                    results[index] = (False, f"{app.get('name')}_{app.get('uid')}_{app.get('version')}")
+                    return
+            for version, update in versions:
+                await downloads.put((index, app, version, update))
+
+        async def download() -> None:
+            while True:
+                job = await downloads.get()
+                if job is None:
+                    return
+                index, app, version, update = job
+                try:
+                    result = await self._download_version(app, version, update)
+                    if result is not None:
+                        results[index] = result
+                except InsufficientSpaceError as e:
+                    self.logger.warning(f"Deferring {app.get('uid')} v{version}: {e.strerror}")
+                    deferred.append((e.size, index, app, version, update))
+                except Exception as e:
+                    self.logger.error(f"Error downloading {app.get('uid')} v{version}: {str(e)}")
+
+        download_tasks = [asyncio.create_task(download()) for _ in range(self.download_workers)]
+        try:
+            await asyncio.gather(*(lookup(index, app) for index, app in enumerate(apps_data)))
+        finally:
+            for _ in download_tasks:
+                await downloads.put(None)
+            await asyncio.gather(*download_tasks)
+
+        # Packages that did not fit get another chance once every other download is over, smallest first
+        for _, index, app, version, update in sorted(deferred, key=lambda job: job[0]):
+            try:
+                result = await self._download_version(app, version, update)
+                if result is not None:
+                    results[index] = result
+            except InsufficientSpaceError as e:
+                self.logger.error(f"Skipping {app.get('uid')} v{version}: {e.strerror}")
+        return results
+
+    async def check_and_update_apps(self) -> Tuple[List[str], List[str]]:
+        """
+        Check all apps in the configuration for updates and download new versions.
+
+        Returns:
+            Tuple of (downloaded_apps, skipped_apps)
+        """
+        if not self.cookies:
+            self.logger.error("Not authenticated. Call authenticate() first.")
+            return [], []
+
+        downloaded_apps = []
+        skipped_apps = []
+
+        try:
+            # Read apps configuration
+            apps_data = self.load_apps_file()
+            self.load_metadata_cache()
+            self.output_index.load(self.manifest if self.trust_manifest else None)
+
+            due_apps, pending_apps = self._get_due_apps(apps_data)
+            self.logger.info(f"Checking updates for {len(due_apps)} of {len(apps_data)} apps with "
+                             f"{self.lookup_workers} lookup and {self.download_workers} download task(s)...")
+
+            results = await self._run_pipeline(due_apps)
+            results += [(False, f"{app.get('name')}_{app.get('uid')}_{app.get('version')}") for app in pending_apps]
+
+            for downloaded, label in results:
+                if downloaded:
+                    downloaded_apps.append(label)
+                else:
+                    skipped_apps.append(label)
+
+            self.metrics.finish(downloaded_apps, skipped_apps)
+            return downloaded_apps, skipped_apps
+
+        except FileNotFoundError:
+            self.logger.error(f"Apps file '{self.apps_file}' not found")
+            return [], []
+        except json.JSONDecodeError:
+            self.logger.error(f"Invalid JSON in '{self.apps_file}'")
+            return [], []
+        except Exception as e:
+            self.logger.error(f"Error checking for updates: {str(e)}")
+            return [], []
+        finally:
+            # Persist whatever was updated, even if the run was interrupted
+            if self.apps_data is not None:
+                self.flush_apps_file()
+            self.save_metadata_cache()
+            self.save_manifest()
+
+    async def run(self) -> Tuple[List[str], List[str]]:
+        """
+        Authenticate and check all apps using a single shared client session.
+
+        Returns:
+            Tuple of (downloaded_apps, skipped_apps)
+        """
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.pool_size)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            self.session = session
+            self._async_auth_lock = asyncio.Lock()
+            try:
+                await self.authenticate()
+                return await self.check_and_update_apps()
+            finally:
+                self.session = None
+
+    async def run_forever(self) -> None:
+        """
+        Authenticate once, then check all apps every ``interval`` seconds until interrupted.
+
+        A single client session is shared by all runs. Metrics are exported and
+        reset after every run.
+        """
+        self._exit_on_sigterm()
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.pool_size)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            self.session = session
+            self._async_auth_lock = asyncio.Lock()
+            try:
+                await self.authenticate()
+                while True:
+                    started = time.monotonic()
+                    try:
+                        downloaded, skipped = await self.check_and_update_apps()
+                        self.logger.info(f"Run completed: {len(downloaded)} app(s) downloaded, {len(skipped)} skipped")
+                        self.export_metrics()
+                    except Exception as e:
+                        self.logger.error(f"Run failed: {str(e)}")
+                    self.metrics = RunMetrics()
+                    # The next run may renew the session once more, it can expire in between
+                    self._fresh_cookies = None
+
+                    delay = max(0.0, self.interval - (time.monotonic() - started))
+                    self.logger.info(f"Next run in {delay:.0f}s")
+                    await asyncio.sleep(delay)
+            finally:
+                self.session = None
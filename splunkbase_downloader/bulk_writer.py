@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from typing import IO
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+# sync_file_range(2) flags
+SYNC_FILE_RANGE_WAIT_BEFORE = 0x01
+SYNC_FILE_RANGE_WRITE = 0x02
+SYNC_FILE_RANGE_WAIT_AFTER = 0x04
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # Windows
+    PAGE_SIZE = 4096
+
+_sync_file_range = None
+if ctypes is not None and sys.platform.startswith("linux"):
+    try:
+        _sync_file_range = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True).sync_file_range
+        _sync_file_range.argtypes = [ctypes.c_int, ctypes.c_int64, ctypes.c_int64, ctypes.c_uint]
+        _sync_file_range.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _sync_file_range = None
+
+
+def sync_range(fd: int, offset: int, length: int, flags: int) -> None:
+    """Start or wait for the writeback of a byte range of a file, where the platform allows it."""
+    if _sync_file_range is not None:
+        _sync_file_range(fd, offset, length, flags)
+
+
+def drop_cache(fd: int, offset: int = 0, length: int = 0) -> None:
+    """
+    Drop the clean pages of a byte range of a file from the page cache.
+
+    Args:
+        fd: File descriptor of the file
+        offset: First byte of the range
+        length: Length of the range, 0 for the rest of the file
+    """
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+
+
+class BulkWriter:
+    """
+    Write a file through large buffers aligned on the file offset, keeping it out of the page cache.
+
+    Each full buffer is written in one call, then its writeback is started without
+    waiting. The writeback of the previous buffer is awaited and its pages are
+    dropped with posix_fadvise(DONTNEED), so a download never holds more than two
+    buffers of dirty or cached pages. Nothing is fsync'd: flush the writer, then
+    fsync the file once it is complete.
+
+    Args:
+        file: The binary file to write, positioned where writing starts
+        buffer_size: Buffer size in bytes, rounded to a multiple of the page size
+    """
+
+    BUFFER_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, file: IO[bytes], buffer_size: int = BUFFER_SIZE):
+        self.file = file
+        self.buffer_size = self.align(buffer_size)
+        self.offset = file.tell()
+        self._buffer = bytearray(self.buffer_size)
+        self._filled = 0
+        self._written = None
+
+    @staticmethod
+    def align(buffer_size: int) -> int:
+        """Round a buffer size down to a multiple of the page size, at least one page."""
+        return max(PAGE_SIZE, buffer_size // PAGE_SIZE * PAGE_SIZE)
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def _get_capacity(self) -> int:
+        """Return the size of the current buffer, which ends on a buffer_size boundary of the file."""
+        return self.buffer_size - self.offset % self.buffer_size
+
+    def write(self, data: bytes) -> int:
+        """Buffer data, writing every buffer that fills up."""
+        view = memoryview(data)
+        while view:
+            size = min(len(view), self._get_capacity() - self._filled)
+            self._buffer[self._filled:self._filled + size] = view[:size]
+            self._filled += size
+            view = view[size:]
+            if self._filled == self._get_capacity():
+                self._write_buffer()
+        return len(data)
+
+    def _write_buffer(self) -> None:
+        """Write the buffer to the file and recycle the pages of the previously written one."""
+        if not self._filled:
+            return
+        self.file.write(memoryview(self._buffer)[:self._filled])
+        self.file.flush()
+        fd = self.file.fileno()
+        start, length = self.offset, self._filled
+        self.offset += self._filled
+        self._filled = 0
+
+        sync_range(fd, start, length, SYNC_FILE_RANGE_WRITE)
+        if self._written is not None:
+            previous_start, previous_length = self._written
+            sync_range(fd, previous_start, previous_length,
+                       SYNC_FILE_RANGE_WAIT_BEFORE | SYNC_FILE_RANGE_WRITE | SYNC_FILE_RANGE_WAIT_AFTER)
+            drop_cache(fd, previous_start, previous_length)
+        self._written = (start, length)
+
+    def flush(self) -> None:
+        """Write the buffered data to the file."""
+        self._write_buffer()
+        self.file.flush()
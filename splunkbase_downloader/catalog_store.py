@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite storage of the apps catalog, for catalogs too large for a JSON apps file.
+
+Convert between the two formats with:
+
+    python splunkbase_downloader/catalog_store.py import apps.json apps.db
+    python splunkbase_downloader/catalog_store.py export apps.db apps.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from io import open
+from typing import Dict, Iterable, List
+
+try:
+    from .file_utils import write_json_atomic
+except ImportError:
+    from file_utils import write_json_atomic
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def is_sqlite_catalog(path: str) -> bool:
+    """Return True if an apps file path designates a SQLite catalog."""
+    return str(path).lower().endswith(SQLITE_EXTENSIONS)
+
+
+class SqliteCatalogStore:
+    """
+    Apps catalog stored in SQLite, one row per app indexed by uid.
+
+    App entries are stored as JSON documents, so they keep every field of the
+    JSON apps file format. Each update is its own transaction, so an app entry
+    is durable as soon as it is recorded. The connection is shared by the
+    workers of a run and serialized by a lock.
+
+    Args:
+        path: The database file, created if needed
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS apps ("
+                "uid TEXT PRIMARY KEY, position INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def load(self) -> List[Dict]:
+        """Return every app entry, in catalog order."""
+        with self._lock:
+            rows = self._connection.execute("SELECT data FROM apps ORDER BY position").fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def update(self, app: Dict) -> bool:
+        """
+        Replace the entry of an app already in the catalog.
+
+        Args:
+            app: The app entry
+
+        Returns:
+            True if the app was found and updated
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE apps SET data = ? WHERE uid = ?", (json.dumps(app), str(app.get('uid')))
+            )
+        return cursor.rowcount > 0
+
+    def save(self, apps: Iterable[Dict]) -> None:
+        """
+        Insert or replace app entries in a single transaction, keeping their order.
+
+        Apps missing from apps are left untouched.
+
+        Args:
+            apps: The app entries, in catalog order
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO apps (uid, position, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(uid) DO UPDATE SET position = excluded.position, data = excluded.data",
+                ((str(app.get('uid')), position, json.dumps(app)) for position, app in enumerate(apps))
+            )
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Import a JSON apps file.
+
+        Args:
+            json_path: The JSON apps file
+
+        Returns:
+            The number of imported apps
+        """
+        with open(json_path, 'r', encoding='utf-8') as file:
+            apps = json.load(file)
+        self.save(apps)
+        return len(apps)
+
+    def export_json(self, json_path: str) -> int:
+        """
+        Export the catalog to a JSON apps file.
+
+        Args:
+            json_path: The JSON apps file, replaced atomically
+
+        Returns:
+            The number of exported apps
+        """
+        apps = self.load()
+        write_json_atomic(json_path, apps)
+        return len(apps)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert the apps catalog between JSON and SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Import a JSON apps file into a SQLite catalog")
+    import_parser.add_argument("json_file", help="JSON apps file")
+    import_parser.add_argument("database", help="SQLite catalog")
+    export_parser = subparsers.add_parser("export", help="Export a SQLite catalog to a JSON apps file")
+    export_parser.add_argument("database", help="SQLite catalog")
+    export_parser.add_argument("json_file", help="JSON apps file")
+    args = parser.parse_args()
+    if args.command == "export" and not os.path.exists(args.database):
+        parser.error(f"SQLite catalog {args.database} not found")
+
+    store = SqliteCatalogStore(args.database)
+    try:
+        if args.command == "import":
+            print(f"Imported {store.import_json(args.json_file)} app(s) into {args.database}")
+        else:
+            print(f"Exported {store.export_json(args.json_file)} app(s) to {args.json_file}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
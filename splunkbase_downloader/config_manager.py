@@ -67,6 +67,10 @@ class ConfigurationManager:
             *args: Positional arguments for ArgumentParser.add_argument
             **kwargs: Keyword arguments for ArgumentParser.add_argument
         """
+        # An absent flag must not hide the value of the other sources
+        if kwargs.get("action") == "store_true":
+            kwargs.setdefault("default", None)
+
         # Add the argument to the parser
         self.parser.add_argument(*args, **kwargs)
 
@@ -109,21 +113,21 @@ class ConfigurationManager:
         arg_def = self.parser._option_string_actions.get(f'--{arg_key}')
         valid_choices = getattr(arg_def, 'choices', None) if arg_def else None
 
-        value =  (
+        value = self._first_set(
             # Check CLI args
-            args.get(arg_key) or
+            args.get(arg_key),
 
             # Check YAML with section
-            (self.yaml_data.get(section, {}).get(key) if section else self.yaml_data.get(key)) or
+            (self.yaml_data.get(section, {}).get(key) if section else self.yaml_data.get(key)),
 
             # Check INI with section
-            (self.ini_data.get(section, {}).get(key) if section else self.ini_data.get(key)) or
+            (self.ini_data.get(section, {}).get(key) if section else self.ini_data.get(key)),
 
             # Check environment variables
-            os.getenv(env_key or key.upper()) or
+            os.getenv(env_key or key.upper()),
 
             # Check kwargs with section
-            (self.kwargs.get(section, {}).get(key) if section else self.kwargs.get(key)) or
+            (self.kwargs.get(section, {}).get(key) if section else self.kwargs.get(key)),
 
             # Return default value
             default
@@ -141,6 +145,19 @@ class ConfigurationManager:
             self.config_data[key] = value
         return value
 
+    @staticmethod
+    def _first_set(*values: Any) -> Any:
+        """
+        Return the first value that is set, so that explicit falsy values such as 0 or false are kept.
+
+        Args:
+            *values: Candidate values, by decreasing priority
+
+        Returns:
+            The first value that is neither None nor an empty string, None if there is none
+        """
+        return next((value for value in values if value is not None and value != ""), None)
+
     def set_config_group(self, section: str = "", keys: list = [], env_prefix: str = "") -> Dict[str, Any]:
         """
         Sets a configuration group by applying the set_config method to each key in the provided list.
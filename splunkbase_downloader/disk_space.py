@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import os
+import shutil
+import sys
+import threading
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+# fallocate(2) flag allocating blocks without changing the file size
+FALLOC_FL_KEEP_SIZE = 0x01
+
+_fallocate = None
+if ctypes is not None and sys.platform.startswith("linux"):
+    try:
+        _fallocate = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True).fallocate
+        _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+        _fallocate.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _fallocate = None
+
+
+class InsufficientSpaceError(OSError):
+    """
+    Raised when a download does not fit in the free space of the output volume.
+
+    Args:
+        path: The package path
+        size: Bytes the download needs
+        available: Bytes available for it
+    """
+
+    def __init__(self, path: str, size: int, available: int):
+        super().__init__(errno.ENOSPC, f"Not enough disk space for {path}: {size} bytes needed, {available} available")
+        self.size = size
+
+
+def preallocate(fd: int, offset: int, length: int) -> bool:
+    """
+    Allocate the disk blocks of a byte range of a file without changing its size.
+
+    Allocating a package up front keeps it contiguous on disk and makes a full
+    volume fail before the transfer starts. Only supported on Linux.
+
+    Args:
+        fd: File descriptor of the file
+        offset: First byte of the range
+        length: Length of the range
+
+    Returns:
+        True if the range is allocated, False if the platform or filesystem does not support it
+    """
+    if _fallocate is None or length <= 0:
+        return False
+    if _fallocate(fd, FALLOC_FL_KEEP_SIZE, offset, length) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error == errno.ENOSPC:
+        raise OSError(error, os.strerror(error))
+    return False
+
+
+class DiskSpace:
+    """
+    Free space of the output volume, shared by all downloads of a run.
+
+    Downloads reserve the bytes they still have to write before they start, so
+    concurrent downloads never commit more than the volume can hold.
+
+    Args:
+        directory: The output directory
+        min_free: Bytes to always leave free on the volume
+    """
+
+    def __init__(self, directory: str, min_free: int = 0):
+        self.directory = directory
+        self.min_free = max(0, min_free)
+        self.reserved = 0
+        self._lock = threading.Lock()
+
+    def _get_free(self) -> int:
+        """Return the free bytes of the volume holding the output directory."""
+        directory = os.path.abspath(self.directory)
+        while not os.path.isdir(directory) and os.path.dirname(directory) != directory:
+            directory = os.path.dirname(directory)
+        return shutil.disk_usage(directory).free
+
+    def available(self) -> int:
+        """Return the bytes a new download may use."""
+        with self._lock:
+            return max(0, self._get_free() - self.reserved - self.min_free)
+
+    def reserve(self, size: int) -> bool:
+        """
+        Reserve space for a download.
+
+        Args:
+            size: Bytes the download still has to write
+
+        Returns:
+            True if reserved, False if the download does not fit
+        """
+        with self._lock:
+            if self._get_free() - self.reserved - self.min_free < size:
+                return False
+            self.reserved += size
+            return True
+
+    def release(self, size: int) -> None:
+        """Give back space reserved by a download, once written or abandoned."""
+        with self._lock:
+            self.reserved = max(0, self.reserved - size)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import threading
+from io import open
+from typing import IO, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Serializes seek + write where os.pwrite is missing
+_write_at_lock = threading.Lock()
+
+
+def write_text_atomic(path: str, text: str, mode: Optional[int] = None) -> None:
+    """
+    Write text to path without ever exposing a truncated file.
+
+    The text is written and fsync'd to a temporary file in the same directory,
+    which then atomically replaces path.
+
+    Args:
+        path: Destination file
+        text: File content
+        mode: Permissions of the new file. Defaults to those of the file being
+            replaced, or 0600 if it does not exist yet
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, 'w', encoding='utf-8') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        if mode is None and os.path.exists(path):
+            mode = os.stat(path).st_mode & 0o7777
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomic(path: str, data: Any, indent: Optional[int] = 4, mode: Optional[int] = None) -> None:
+    """
+    Write data as JSON to path without ever exposing a truncated file.
+
+    Args:
+        path: Destination file
+        data: JSON serializable data
+        indent: JSON indentation, None for a compact file
+        mode: Permissions of the new file, see write_text_atomic
+    """
+    write_text_atomic(path, json.dumps(data, indent=indent), mode=mode)
+
+
+def read_json(path: Optional[str], default: Any = None) -> Any:
+    """
+    Read a JSON file, returning default if it is missing or unreadable.
+
+    Args:
+        path: File to read, None returns default
+        default: Value returned when the file cannot be loaded
+
+    Returns:
+        The decoded JSON data or default
+    """
+    if not path:
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return default
+
+
+def open_locked(path: str) -> Optional[IO[bytes]]:
+    """
+    Open (creating it if needed) a file for reading and writing with an exclusive lock.
+
+    The lock is held until the file is closed and is released by the OS if the
+    process dies. Locking is skipped on platforms without fcntl.
+
+    Args:
+        path: File to open
+
+    Returns:
+        The open binary file, positioned at its start, or None if another process
+        or thread holds the lock
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    file = os.fdopen(fd, 'r+b')
+    if fcntl is not None:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return None
+    return file
+
+
+def replace_locked(file: IO[bytes], src: str, dst: str) -> None:
+    """
+    Atomically rename a file opened with open_locked, then close it.
+
+    Where locks are supported the rename happens while the lock is still held, so
+    no other writer can open the file under its old name in between. The directory
+    entry is fsync'd so that the rename survives a crash.
+
+    Args:
+        file: The locked file
+        src: Current path of the file
+        dst: Destination path
+    """
+    if fcntl is None:
+        # Windows cannot rename an open file
+        file.close()
+    os.replace(src, dst)
+    file.close()
+    fsync_directory(os.path.dirname(os.path.abspath(dst)))
+
+
+def fsync_directory(directory: str) -> None:
+    """Flush a directory entry to disk, where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_at(fd: int, data: bytes, offset: int) -> None:
+    """
+    Write data at a given position of a file, so that several threads can fill one file.
+
+    Args:
+        fd: File descriptor of the file
+        data: Bytes to write
+        offset: Position of the first byte
+    """
+    view = memoryview(data)
+    if hasattr(os, "pwrite"):
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+        return
+
+    with _write_at_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        while view:
+            view = view[os.write(fd, view):]
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import threading
+from io import open
+from typing import Dict, Optional, Tuple
+
+try:
+    from .file_utils import read_json, write_json_atomic
+except ImportError:
+    from file_utils import read_json, write_json_atomic
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024, digest=None):
+    """
+    Feed the content of a file to a SHA-256 digest.
+
+    Args:
+        path: File to hash
+        chunk_size: Read size in bytes
+        digest: Digest to update, a new SHA-256 digest if None
+
+    Returns:
+        The updated digest
+    """
+    digest = digest or hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest
+
+
+class PackageManifest:
+    """
+    Sidecar manifest recording the SHA-256 and size of every package in the output directory.
+
+    Packages are verified against their recorded size and modification time, which
+    costs a stat. They are only re-hashed when these changed.
+
+    Args:
+        output: The output directory
+        file_name: Name of the manifest file inside the output directory
+    """
+
+    FILE_NAME = ".manifest.json"
+
+    def __init__(self, output: str, file_name: str = FILE_NAME):
+        self.path = os.path.join(output, file_name)
+        self.entries: Dict[str, Dict] = read_json(self.path, default={})
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def get(self, file_name: str) -> Optional[Dict]:
+        """Return the manifest entry of a package, None if it is not recorded."""
+        with self._lock:
+            return self.entries.get(file_name)
+
+    def record(self, path: str, sha256: str) -> Dict:
+        """
+        Record a package that was just written.
+
+        Args:
+            path: The package path
+            sha256: Hex SHA-256 of the package
+
+        Returns:
+            The manifest entry
+        """
+        stat = os.stat(path)
+        entry = {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        with self._lock:
+            self.entries[os.path.basename(path)] = entry
+            self._dirty = True
+        return entry
+
+    def forget(self, file_name: str) -> None:
+        """Remove a package from the manifest."""
+        with self._lock:
+            if self.entries.pop(file_name, None) is not None:
+                self._dirty = True
+
+    def verify(self, path: str, chunk_size: int = 1024 * 1024, stat: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Check that a package on disk matches its manifest entry.
+
+        Packages missing from the manifest, e.g. downloaded by an older version, are
+        hashed once and recorded as they are.
+
+        Args:
+            path: The package path
+            chunk_size: Read size in bytes if the package has to be hashed
+            stat: The (size, mtime_ns) of the package if already known, saves a stat
+
+        Returns:
+            True if the package is valid, False if it is corrupt or truncated
+        """
+        file_name = os.path.basename(path)
+        entry = self.get(file_name)
+        if stat is None:
+            file_stat = os.stat(path)
+            stat = (file_stat.st_size, file_stat.st_mtime_ns)
+        size, mtime_ns = stat
+
+        if entry is None:
+            self.record(path, hash_file(path, chunk_size).hexdigest())
+            return True
+
+        if entry.get("size") == size and entry.get("mtime_ns") == mtime_ns:
+            return True
+
+        # The file changed since it was recorded, only its content can tell
+        if entry.get("size") == size and hash_file(path, chunk_size).hexdigest() == entry.get("sha256"):
+            self.record(path, entry["sha256"])
+            return True
+        return False
+
+    def save(self) -> None:
+        """Write the manifest if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            write_json_atomic(self.path, self.entries, mode=0o644)
+            self._dirty = False
+
+
+class OutputIndex:
+    """
+    In-memory index of the packages in the output directory.
+
+    The directory is listed once, or rebuilt from the package manifest without
+    touching the directory at all, and kept up to date as packages land, so that
+    skip decisions are memory lookups instead of a stat per app. A directory listing
+    does not stat the packages, their (size, mtime_ns) is then left unknown.
+
+    Args:
+        output: The output directory
+    """
+
+    def __init__(self, output: str):
+        self.output = output
+        self.entries: Optional[Dict[str, Optional[Tuple[int, int]]]] = None
+        self._lock = threading.Lock()
+
+    def load(self, manifest: Optional[PackageManifest] = None) -> None:
+        """
+        Build the index, creating the output directory if needed.
+
+        Args:
+            manifest: Trust this manifest instead of listing the directory
+        """
+        os.makedirs(self.output, exist_ok=True)
+        if manifest is not None:
+            entries = {
+                name: (entry.get("size"), entry.get("mtime_ns"))
+                for name, entry in manifest.entries.items()
+            }
+        else:
+            with os.scandir(self.output) as iterator:
+                entries = {entry.name: None for entry in iterator if entry.is_file()}
+        with self._lock:
+            self.entries = entries
+
+    def __contains__(self, file_name: str) -> bool:
+        """Return True if the package is in the output directory."""
+        if self.entries is None:
+            self.load()
+        with self._lock:
+            return file_name in self.entries
+
+    def get(self, file_name: str) -> Optional[Tuple[int, int]]:
+        """Return the (size, mtime_ns) of a package, None if it is missing or was not stat'ed."""
+        if self.entries is None:
+            self.load()
+        with self._lock:
+            return self.entries.get(file_name)
+
+    def add(self, file_name: str, size: int, mtime_ns: int) -> None:
+        """Record a package that landed in the output directory."""
+        with self._lock:
+            if self.entries is not None:
+                self.entries[file_name] = (size, mtime_ns)
+
+    def remove(self, file_name: str) -> None:
+        """Forget a package removed from the output directory."""
+        with self._lock:
+            if self.entries is not None:
+                self.entries.pop(file_name, None)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from .file_utils import write_json_atomic, write_text_atomic
+except ImportError:
+    from file_utils import write_json_atomic, write_text_atomic
+
+
+class RunMetrics:
+    """Collects per-app phase timings and transfer volumes for a downloader run."""
+
+    PHASES = ("login", "version_lookup", "download_ttfb", "transfer", "disk_write", "apps_file_update", "catalog_sync")
+    PROMETHEUS_PREFIX = "splunkbase_downloader"
+
+    def __init__(self):
+        """Initialize an empty run."""
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.wall_time: Optional[float] = None
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.apps: Dict[str, Dict[str, float]] = {}
+        self.results: Dict[str, int] = {"downloaded": 0, "skipped": 0}
+
+    def add(self, phase: str, seconds: float, uid: Any = None) -> None:
+        """
+        Record the duration of a phase.
+
+        Args:
+            phase: Phase name, one of PHASES
+            seconds: Duration of the phase
+            uid: The app the phase belongs to, None for run-wide phases
+        """
+        with self._lock:
+            stats = self.phases.setdefault(phase, {"count": 0, "seconds": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            if uid is not None:
+                app = self.apps.setdefault(str(uid), {})
+                app[phase] = app.get(phase, 0.0) + seconds
+
+    def add_bytes(self, uid: Any, size: int) -> None:
+        """
+        Record bytes transferred for an app.
+
+        Args:
+            uid: The app's unique identifier
+            size: Number of bytes received
+        """
+        with self._lock:
+            app = self.apps.setdefault(str(uid), {})
+            app["bytes"] = app.get("bytes", 0) + size
+
+    @contextmanager
+    def phase(self, phase: str, uid: Any = None) -> Iterator[None]:
+        """
+        Time the enclosed block as a phase.
+
+        Args:
+            phase: Phase name, one of PHASES
+            uid: The app the phase belongs to, None for run-wide phases
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start, uid)
+
+    def finish(self, downloaded: List[str], skipped: List[str]) -> None:
+        """
+        Close the run with its results.
+
+        Args:
+            downloaded: The downloaded apps
+            skipped: The skipped apps
+        """
+        with self._lock:
+            self.wall_time = time.perf_counter() - self._start
+            self.results = {"downloaded": len(downloaded), "skipped": len(skipped)}
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the run summary as a JSON serializable dictionary."""
+        with self._lock:
+            wall_time = self.wall_time if self.wall_time is not None else time.perf_counter() - self._start
+            total_bytes = sum(int(app.get("bytes", 0)) for app in self.apps.values())
+            return {
+                "started": self.started,
+                "wall_time": round(wall_time, 3),
+                "bytes": total_bytes,
+                "bytes_per_sec": round(total_bytes / wall_time) if wall_time else 0,
+                "results": dict(self.results),
+                "phases": {
+                    phase: {
+                        "count": stats["count"],
+                        "seconds": round(stats["seconds"], 3),
+                        "avg": round(stats["seconds"] / stats["count"], 3),
+                        "max": round(stats["max"], 3)
+                    }
+                    for phase, stats in self.phases.items()
+                },
+                "apps": {uid: {key: round(value, 3) for key, value in app.items()} for uid, app in self.apps.items()}
+            }
+
+    def format_summary(self) -> str:
+        """Return a one line human readable summary."""
+        summary = self.summary()
+        phases = ", ".join(f"{phase} {stats['seconds']}s" for phase, stats in summary["phases"].items())
+        return (f"Run took {summary['wall_time']}s, {summary['bytes']} bytes received "
+                f"({summary['bytes_per_sec']} B/s); {phases}")
+
+    def to_prometheus(self) -> str:
+        """Return the run summary in the Prometheus text exposition format."""
+        summary = self.summary()
+        prefix = self.PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {prefix}_run_duration_seconds Wall time of the last run.",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {summary['wall_time']}",
+            f"# HELP {prefix}_run_timestamp_seconds Start time of the last run.",
+            f"# TYPE {prefix}_run_timestamp_seconds gauge",
+            f"{prefix}_run_timestamp_seconds {round(summary['started'], 3)}",
+            f"# HELP {prefix}_received_bytes Bytes downloaded by the last run.",
+            f"# TYPE {prefix}_received_bytes gauge",
+            f"{prefix}_received_bytes {summary['bytes']}",
+            f"# HELP {prefix}_apps Apps processed by the last run, by result.",
+            f"# TYPE {prefix}_apps gauge",
+        ]
+        lines += [f'{prefix}_apps{{result="{result}"}} {count}' for result, count in summary["results"].items()]
+        lines += [
+            f"# HELP {prefix}_phase_seconds Time spent in each phase by the last run.",
+            f"# TYPE {prefix}_phase_seconds gauge",
+        ]
+        lines += [f'{prefix}_phase_seconds{{phase="{phase}"}} {stats["seconds"]}' for phase, stats in summary["phases"].items()]
+        lines += [
+            f"# HELP {prefix}_phase_count Occurrences of each phase in the last run.",
+            f"# TYPE {prefix}_phase_count gauge",
+        ]
+        lines += [f'{prefix}_phase_count{{phase="{phase}"}} {stats["count"]}' for phase, stats in summary["phases"].items()]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, file_format: str = "json") -> None:
+        """
+        Write the run summary to a file.
+
+        Args:
+            path: Destination file
+            file_format: 'json' or 'prometheus' (node_exporter textfile collector format)
+        """
+        if file_format == "prometheus":
+            write_text_atomic(path, self.to_prometheus(), mode=0o644)
+        else:
+            write_json_atomic(path, self.summary(), mode=0o644)
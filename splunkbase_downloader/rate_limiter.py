@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter with adaptive (AIMD) concurrency, shared by all workers.
+
+    Every request takes a token from a bucket refilled at ``rate`` tokens per second
+    and a slot among ``limit`` concurrent requests. The concurrency limit is halved
+    when Splunkbase throttles (429) or fails (5xx), and grows back by one slot after
+    ``limit`` consecutive successes, between 1 and ``max_concurrency``.
+
+    Args:
+        rate: Requests per second, 0 disables the token bucket
+        max_concurrency: Upper bound of concurrent requests
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, rate: float = 0.0, max_concurrency: int = 1):
+        self.rate = max(0.0, rate)
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self._successes = 0
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _try_acquire(self) -> float:
+        """
+        Take a token and a concurrency slot if both are available.
+
+        Returns:
+            0 when acquired, otherwise the number of seconds to wait before trying again
+        """
+        with self._condition:
+            if self.rate:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+            if self.in_flight >= self.limit:
+                return self.POLL_INTERVAL
+            if self.rate and self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+
+            if self.rate:
+                self.tokens -= 1
+            self.in_flight += 1
+            return 0
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            delay = self._try_acquire()
+            if not delay:
+                return
+            with self._condition:
+                self._condition.wait(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until a request may be sent."""
+        while True:
+            delay = self._try_acquire()
+            if not delay:
+                return
+            await asyncio.sleep(min(delay, self.POLL_INTERVAL))
+
+    def release(self, throttled: bool = False) -> None:
+        """
+        Release a concurrency slot and adapt the limit to the outcome of the request.
+
+        Args:
+            throttled: True if the request was throttled or failed on the server side
+        """
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for throttled or failed requests.
+
+    Args:
+        max_retries: Number of retries after the first attempt
+        backoff: Base delay in seconds, doubled on every attempt
+        max_backoff: Upper bound of a single delay in seconds
+    """
+
+    RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_retries: int = 3, backoff: float = 1.0, max_backoff: float = 60.0):
+        self.max_retries = max(0, max_retries)
+        self.backoff = max(0.0, backoff)
+        self.max_backoff = max_backoff
+
+    def is_retryable(self, status_code: int) -> bool:
+        """Return True if a response with this status should be retried."""
+        return status_code in self.RETRYABLE_STATUS
+
+    def get_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Return how long to wait before the next attempt.
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 0
+            retry_after: Retry-After header of the response, in seconds or as an HTTP date
+
+        Returns:
+            The delay in seconds
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        return max(delay, self._parse_retry_after(retry_after))
+
+    @staticmethod
+    def _parse_retry_after(retry_after: Optional[str]) -> float:
+        """Convert a Retry-After header to seconds, 0 if missing or invalid."""
+        if not retry_after:
+            return 0.0
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+
+
+class BandwidthLimiter:
+    """
+    Token bucket capping a transfer rate in bytes per second.
+
+    Consumers take tokens for the bytes they already received and sleep off any
+    debt, so a single limiter can be shared by all downloads for a global cap, or
+    owned by one download for a per-download cap.
+
+    Args:
+        rate: Bytes per second, 0 disables the limiter
+    """
+
+    def __init__(self, rate: float = 0.0):
+        self.rate = max(0.0, rate)
+        self.capacity = self.rate
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, size: int) -> float:
+        """
+        Take tokens for size bytes, going into debt if needed.
+
+        Returns:
+            The number of seconds to wait to pay the debt back
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= size
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def consume(self, size: int) -> None:
+        """Block until size received bytes fit within the rate."""
+        delay = self._reserve(size)
+        if delay:
+            time.sleep(delay)
+
+    async def consume_async(self, size: int) -> None:
+        """Wait on the event loop until size received bytes fit within the rate."""
+        delay = self._reserve(size)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class ByteBudget:
+    """
+    Bound on the bytes held in memory by all downloads at once.
+
+    A request larger than the whole budget is granted when nothing else is held,
+    so that it cannot wait forever.
+
+    Args:
+        limit: Bytes, 0 disables the budget
+    """
+
+    POLL_INTERVAL = 0.01
+
+    def __init__(self, limit: int = 0):
+        self.limit = max(0, limit)
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def _try_acquire(self, size: int) -> bool:
+        """Take size bytes of the budget if available."""
+        with self._condition:
+            if self.limit and self.in_use and self.in_use + size > self.limit:
+                return False
+            self.in_use += size
+            return True
+
+    def acquire(self, size: int) -> None:
+        """Block until size bytes of the budget are available."""
+        with self._condition:
+            while not self._try_acquire(size):
+                self._condition.wait()
+
+    async def acquire_async(self, size: int) -> None:
+        """Wait on the event loop until size bytes of the budget are available."""
+        while not self._try_acquire(size):
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    def release(self, size: int) -> None:
+        """Give size bytes back to the budget."""
+        with self._condition:
+            self.in_use = max(0, self.in_use - size)
+            self._condition.notify_all()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import re
+from typing import List, Optional, Tuple
+
+_CLAUSE = re.compile(r"^(==|!=|>=|<=|>|<|~|\^|=)?\s*v?([0-9][0-9A-Za-z.\-+*]*)$")
+
+
+def parse_version(version: str) -> Tuple[int, ...]:
+    """
+    Convert a version string to a tuple of integers that compares naturally.
+
+    Only the leading digits of each dot separated component are kept, so
+    '9.0.1' gives (9, 0, 1) and '1.2.0b1' gives (1, 2, 0).
+
+    Args:
+        version: The version string
+
+    Returns:
+        The version key
+    """
+    key = []
+    for component in str(version).strip().lstrip("vV").split("."):
+        match = re.match(r"\d+", component)
+        key.append(int(match.group()) if match else 0)
+    return tuple(key)
+
+
+def compare_versions(left: str, right: str) -> int:
+    """
+    Compare two version strings.
+
+    Returns:
+        -1, 0 or 1 when left is lower than, equal to or greater than right
+    """
+    left_key, right_key = parse_version(left), parse_version(right)
+    length = max(len(left_key), len(right_key))
+    left_key += (0,) * (length - len(left_key))
+    right_key += (0,) * (length - len(right_key))
+    return (left_key > right_key) - (left_key < right_key)
+
+
+class VersionConstraint:
+    """
+    A version constraint such as '~9.0', '^4', '9.x' or '>=8.2,<9'.
+
+    Comma separated clauses must all match. A clause is either a version with an
+    operator among ==, !=, >=, <=, >, <, a tilde range (~9.0.1 means >=9.0.1,<9.1),
+    a caret range (^9.0 means >=9.0,<10), a wildcard (9.x or 9.*) or a bare
+    version, which must match exactly.
+
+    Args:
+        spec: The constraint
+
+    Raises:
+        ValueError: If the constraint cannot be parsed
+    """
+
+    def __init__(self, spec: str):
+        self.spec = str(spec).strip()
+        self.clauses: List[Tuple[str, str]] = []
+        for clause in self.spec.split(","):
+            self.clauses += self._parse_clause(clause.strip())
+
+    def __str__(self) -> str:
+        return self.spec
+
+    def _parse_clause(self, clause: str) -> List[Tuple[str, str]]:
+        """Convert a clause to a list of (operator, version) comparisons."""
+        match = _CLAUSE.match(clause)
+        if not match:
+            raise ValueError(f"Invalid version constraint '{self.spec}'")
+        operator, version = match.group(1) or "==", match.group(2)
+
+        components = version.split(".")
+        if components[-1] in ("x", "X", "*"):
+            if operator not in ("==", "="):
+                raise ValueError(f"Invalid version constraint '{self.spec}'")
+            operator, components = "~", components[:-1]
+            version = ".".join(components)
+            if len(components) == 1:
+                return [(">=", version), ("<", self._bump(components, 0))]
+
+        if operator == "~":
+            # ~9 allows 9.*, ~9.0 and ~9.0.1 allow patch releases of 9.0 only
+            index = 1 if len(components) > 1 else 0
+            return [(">=", version), ("<", self._bump(components, index))]
+        if operator == "^":
+            key = parse_version(version)
+            index = next((position for position, value in enumerate(key) if value), len(key) - 1)
+            return [(">=", version), ("<", self._bump(components, index))]
+        return [("==" if operator == "=" else operator, version)]
+
+    @staticmethod
+    def _bump(components: List[str], index: int) -> str:
+        """Return the version following components at the given position, e.g. 9.0 at 1 gives 9.1."""
+        key = list(parse_version(".".join(components)))[:index + 1]
+        key[index] += 1
+        return ".".join(str(value) for value in key)
+
+    @property
+    def pinned(self) -> Optional[str]:
+        """The only version allowed by the constraint, None if it allows a range."""
+        if len(self.clauses) == 1 and self.clauses[0][0] == "==":
+            return self.clauses[0][1]
+        return None
+
+    def matches(self, version: str) -> bool:
+        """Return True if version satisfies every clause of the constraint."""
+        for operator, bound in self.clauses:
+            result = compare_versions(version, bound)
+            if not {
+                "==": result == 0,
+                "!=": result != 0,
+                ">=": result >= 0,
+                "<=": result <= 0,
+                ">": result > 0,
+                "<": result < 0,
+            }[operator]:
+                return False
+        return True
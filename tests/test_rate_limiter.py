@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import unittest
+
+import requests
+
+from splunkbase_downloader.app_downloader import SplunkbaseDownloader
+from splunkbase_downloader.rate_limiter import ByteBudget, RateLimiter, RetryPolicy
+
+
+class FailingSession:
+    """Session whose every request raises the given exception."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+def make_downloader(cls, session, max_concurrency=2, max_retries=0):
+    """Build a downloader with just the attributes _send needs, without parsing any arguments."""
+    downloader = object.__new__(cls)
+    downloader.session = session
+    downloader.rate_limiter = RateLimiter(max_concurrency=max_concurrency)
+    downloader.retry_policy = RetryPolicy(max_retries=max_retries, backoff=0.0)
+    downloader.logger = logging.getLogger(cls.__name__)
+    return downloader
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_acquire_release(self):
+        limiter = RateLimiter(max_concurrency=2)
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual(limiter.in_flight, 2)
+        limiter.release()
+        limiter.release()
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_send_releases_slot_on_non_connection_error(self):
+        session = FailingSession(requests.exceptions.TooManyRedirects("too many redirects"))
+        downloader = make_downloader(SplunkbaseDownloader, session)
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.TooManyRedirects):
+                downloader._send("GET", "https://example.invalid/")
+            self.assertEqual(downloader.rate_limiter.in_flight, 0)
+
+    def test_send_releases_slot_after_connection_retries(self):
+        session = FailingSession(requests.ConnectionError("connection refused"))
+        downloader = make_downloader(SplunkbaseDownloader, session, max_retries=2)
+        with self.assertRaises(requests.ConnectionError):
+            downloader._send("GET", "https://example.invalid/")
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(downloader.rate_limiter.in_flight, 0)
+
+
+class TestAsyncRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            self.skipTest("aiohttp is not installed")
+        from splunkbase_downloader.async_downloader import AsyncSplunkbaseDownloader
+        self.cls = AsyncSplunkbaseDownloader
+
+    def test_send_releases_slot_on_error(self):
+        import aiohttp
+
+        class AsyncFailingSession(FailingSession):
+            async def request(self, method, url, **kwargs):
+                self.calls += 1
+                raise self.error
+
+        session = AsyncFailingSession(aiohttp.TooManyRedirects(None, ()))
+        downloader = make_downloader(self.cls, session)
+
+        async def run():
+            for _ in range(2):
+                with self.assertRaises(aiohttp.TooManyRedirects):
+                    await downloader._send("GET", "https://example.invalid/")
+                self.assertEqual(downloader.rate_limiter.in_flight, 0)
+
+        asyncio.run(run())
+
+    def test_send_releases_slot_on_cancel(self):
+        started = None
+
+        class HangingSession:
+            async def request(self, method, url, **kwargs):
+                started.set()
+                await asyncio.sleep(3600)
+
+        downloader = make_downloader(self.cls, HangingSession())
+
+        async def run():
+            nonlocal started
+            started = asyncio.Event()
+            task = asyncio.ensure_future(downloader._send("GET", "https://example.invalid/"))
+            await started.wait()
+            self.assertEqual(downloader.rate_limiter.in_flight, 1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        self.assertEqual(downloader.rate_limiter.in_flight, 0)
+        self.assertEqual(downloader.rate_limiter.limit, 2)
+
+
+class TestByteBudget(unittest.TestCase):
+
+    def test_oversize_request_granted_when_idle(self):
+        budget = ByteBudget(10)
+        budget.acquire(25)
+        budget.release(25)
+        budget.acquire(4)
+        budget.acquire(6)
+        budget.release(10)
+        self.assertEqual(budget.in_use, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
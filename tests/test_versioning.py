@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from splunkbase_downloader.versioning import VersionConstraint, compare_versions
+
+
+class TestVersionConstraint(unittest.TestCase):
+
+    CASES = [
+        # (constraint, version, matches)
+        ("~9", "9.0.0", True),
+        ("~9", "9.4.2", True),
+        ("~9", "10.0", False),
+        ("~9.0", "9.0.7", True),
+        ("~9.0", "9.1.0", False),
+        ("~9.0.1", "9.0.1", True),
+        ("~9.0.1", "9.0.2", True),
+        ("~9.0.1", "9.0.0", False),
+        ("~9.0.1", "9.1.0", False),
+        ("^9.0", "9.3", True),
+        ("^9.0", "10.0", False),
+        ("^0.2.1", "0.2.5", True),
+        ("^0.2.1", "0.3.0", False),
+        ("9.x", "9.9.9", True),
+        ("9.x", "10.0", False),
+        ("9.0.*", "9.0.3", True),
+        ("9.0.*", "9.1", False),
+        (">=8.2,<9", "8.2.0", True),
+        (">=8.2,<9", "8.10", True),
+        (">=8.2,<9", "9.0", False),
+        (">=8.2,!=8.3.1", "8.3.1", False),
+        ("9.0.1", "9.0.1", True),
+        ("9.0.1", "9.0.2", False),
+    ]
+
+    def test_matches(self):
+        for spec, version, expected in self.CASES:
+            with self.subTest(constraint=spec, version=version):
+                self.assertEqual(VersionConstraint(spec).matches(version), expected)
+
+    def test_pinned(self):
+        self.assertEqual(VersionConstraint("9.0.1").pinned, "9.0.1")
+        self.assertEqual(VersionConstraint("==9.0.1").pinned, "9.0.1")
+        self.assertIsNone(VersionConstraint("~9.0.1").pinned)
+        self.assertIsNone(VersionConstraint(">=8.2,<9").pinned)
+
+    def test_invalid(self):
+        for spec in ("", "latest", ">=9.x", "9.0,"):
+            with self.subTest(constraint=spec):
+                with self.assertRaises(ValueError):
+                    VersionConstraint(spec)
+
+    def test_compare_versions(self):
+        self.assertEqual(compare_versions("9.0", "9.0.0"), 0)
+        self.assertEqual(compare_versions("8.10", "8.9"), 1)
+        self.assertEqual(compare_versions("v1.2.0b1", "1.2.1"), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()